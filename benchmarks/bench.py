@@ -0,0 +1,331 @@
+"""
+HumanTyping benchmark suite.
+
+Measures cold import time, plan generation (`MarkovTyper.run`), the size of
+the recorded history, KeyboardLayout lookups, `run_monte_carlo` throughput and
+the per-event overhead of the playback paths (`HumanTyper.type` / `type_sync` /
+`type_appium`) against the in-process fakes of `benchmarks/fakes.py`. Playback
+waits are skipped, so the dispatch figures are the cost of simulating,
+scheduling and sending an event.
+
+Usage (from the repository root):
+    python -m benchmarks.bench --output results.json
+    python -m benchmarks.bench --quick --baseline results.json
+
+With --baseline, every result is compared with the stored one and the run
+exits with status 1 if any got worse by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from unittest import mock
+
+import numpy as np
+
+import humantyping
+from humantyping import HumanTyper, MarkovTyper, integration
+from humantyping.keyboard import get_layout
+from humantyping.language import COMMON_WORDS
+from humantyping.rng import BlockRNG
+from humantyping.simulation import run_monte_carlo
+from .fakes import FakeLocator, FakeDriver, FakeWebElement, VirtualClock
+
+# Text sizes in bytes
+SIZES = (10, 100, 1_000, 10_000, 100_000)
+QUICK_SIZES = (10, 100, 1_000)
+# Largest text the slower benchmarks are run on
+SCALAR_MC_MAX_SIZE = 10_000
+DISPATCH_MAX_SIZE = 10_000
+# Driver round-trip of the fake element in the coalescing scenario (s), e.g. a remote browser
+COALESCE_LATENCY = 0.1
+# Simulated characters per Monte Carlo benchmark (trials = budget / size)
+MC_CHAR_BUDGET = 200_000
+# Statements timed by the import benchmark, each in a fresh interpreter
+IMPORT_STATEMENTS = {
+    "package": "import humantyping",
+    "MarkovTyper": "from humantyping import MarkovTyper",
+    "HumanTyper": "from humantyping import HumanTyper",
+}
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEED = 1234
+
+
+def make_text(size, seed=SEED):
+    """Deterministic English-like text of exactly `size` characters."""
+    rng = random.Random(seed)
+    words = sorted(COMMON_WORDS) + ["keyboard", "simulation", "Markov", "typing", "latency", "été"]
+    parts = []
+    length = 0
+    while length < size:
+        word = rng.choice(words)
+        if rng.random() < 0.1:
+            word = word.capitalize() + rng.choice(".,!?")
+        parts.append(word)
+        length += len(word) + 1
+    return " ".join(parts)[:size]
+
+
+def best_of(fn, repeat):
+    """Best wall time of `repeat` calls to fn()."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def result(name, params, value, unit, better="lower"):
+    return {"name": name, "params": params, "value": value, "unit": unit, "better": better}
+
+
+def bench_typer_run(sizes, repeat):
+    results = []
+    for size in sizes:
+        text = make_text(size)
+        events = len(MarkovTyper(text, seed=SEED).run()[1])
+        elapsed = best_of(lambda: MarkovTyper(text, seed=SEED).run(), repeat)
+        results.append(result("typer_run", {"size": size}, elapsed, "s"))
+        results.append(result("typer_run_rate", {"size": size}, events / elapsed, "events/s", "higher"))
+    return results
+
+
+def history_nbytes(history):
+    """Bytes held by a TypingHistory: the object, its three columns and the distinct key strings."""
+    keys = {id(key): key for key in history.keys}
+    return (sys.getsizeof(history) + sys.getsizeof(history.times) + sys.getsizeof(history.kinds)
+            + sys.getsizeof(history.keys) + sum(sys.getsizeof(key) for key in keys.values()))
+
+
+def bench_history_memory(sizes):
+    """Size of the recorded history itself, and the peak of the whole run for context."""
+    results = []
+    for size in sizes:
+        text = make_text(size)
+        tracemalloc.start()
+        _, history = MarkovTyper(text, seed=SEED).run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        nbytes = history_nbytes(history)
+        results.append(result("history_memory", {"size": size}, nbytes, "bytes"))
+        results.append(result("history_bytes_per_event", {"size": size}, nbytes / len(history), "bytes/event"))
+        results.append(result("typer_run_peak_memory", {"size": size}, peak, "bytes"))
+    return results
+
+
+def bench_keyboard(repeat, layouts=("qwerty", "azerty")):
+    results = []
+    text = make_text(10_000)
+    pairs = list(zip(text, text[1:]))
+    rng = BlockRNG(SEED)
+    for name in layouts:
+        kb = get_layout(name)
+        lookups = {
+            "transition_cost": lambda: [kb.transition_cost(a, b) for a, b in pairs],
+            "get_distance": lambda: [kb.get_distance(a, b) for a, b in pairs],
+            "get_neighbor_keys": lambda: [kb.get_neighbor_keys(a) for a, _ in pairs],
+            "get_random_neighbor": lambda: [kb.get_random_neighbor(a, rng) for a, _ in pairs],
+        }
+        for lookup, fn in lookups.items():
+            elapsed = best_of(fn, repeat)
+            results.append(result("keyboard_lookup", {"layout": name, "lookup": lookup},
+                                  elapsed / len(pairs) * 1e9, "ns/op"))
+    return results
+
+
+def bench_monte_carlo(sizes):
+    results = []
+    for engine in ("vectorized", "scalar"):
+        for size in sizes:
+            if engine == "scalar" and size > SCALAR_MC_MAX_SIZE:
+                continue
+            text = make_text(size)
+            n = max(10, min(5_000, MC_CHAR_BUDGET // size))
+            start = time.perf_counter()
+            run_monte_carlo(text, 60, n_simulations=n, seed=SEED, engine=engine, verbose=False)
+            elapsed = time.perf_counter() - start
+            results.append(result("monte_carlo_rate", {"engine": engine, "size": size},
+                                  n * size / elapsed, "chars/s", "higher"))
+    return results
+
+
+async def _no_wait(delay, result=None):
+    # Still yield to the loop, like a real sleep would
+    await _real_async_sleep(0)
+    return result
+
+_real_async_sleep = asyncio.sleep
+
+
+def bench_dispatch(sizes, repeat):
+    """
+    Per-event overhead of each playback path, with the deadline waits skipped.
+
+    type_coalesce runs in virtual time against a fake element with a
+    COALESCE_LATENCY round-trip, so keystrokes planned closer together than the
+    round-trip are actually coalesced; its figures are wall time per event
+    (virtual waits cost nothing) and events per dispatch.
+    """
+    results = []
+    try:
+        import selenium  # noqa: F401  (type_sync / type_appium build selenium key actions)
+        has_selenium = True
+    except ImportError:
+        has_selenium = False
+        print("selenium is not installed: skipping type_sync / type_appium", file=sys.stderr)
+
+    paths = {
+        "type": lambda typer, text: asyncio.run(typer.type(FakeLocator(), text)),
+        "type_coalesce": lambda typer, text: VirtualClock().run(
+            typer.type(FakeLocator(latency=COALESCE_LATENCY), text)),
+    }
+    if has_selenium:
+        paths.update({
+            "type_sync": lambda typer, text: typer.type_sync(FakeWebElement(), text),
+            "type_sync_batch": lambda typer, text: typer.type_sync(FakeWebElement(), text, batch=True),
+            "type_appium": lambda typer, text: typer.type_appium(FakeDriver(), text),
+            "type_appium_batch": lambda typer, text: typer.type_appium(FakeDriver(), text, batch=True),
+        })
+
+    with mock.patch.object(integration.asyncio, "sleep", _no_wait), \
+            mock.patch.object(integration.time, "sleep", lambda delay: None):
+        for path, play in paths.items():
+            for size in sizes:
+                if size > DISPATCH_MAX_SIZE:
+                    continue
+                text = make_text(size)
+                reports = []
+
+                def run():
+                    typer = HumanTyper(seed=SEED, coalesce=path == "type_coalesce",
+                                       offload_threshold=float("inf"))
+                    reports.append(play(typer, text))
+
+                elapsed = best_of(run, repeat)
+                events = reports[-1].events
+                results.append(result("dispatch_overhead", {"path": path, "size": size},
+                                      elapsed / events * 1e6, "us/event"))
+                if path == "type_coalesce":
+                    results.append(result("coalesce_events_per_dispatch", {"size": size},
+                                          events / reports[-1].dispatches, "events/dispatch", "higher"))
+    return results
+
+
+def bench_import(repeat):
+    """Cold import time of the package, measured in fresh interpreters."""
+    results = []
+    for label, statement in IMPORT_STATEMENTS.items():
+        probe = (
+            "import sys, time\n"
+            "start = time.perf_counter()\n"
+            f"{statement}\n"
+            "print(time.perf_counter() - start, int('numpy' in sys.modules))\n"
+        )
+        best = float("inf")
+        for _ in range(max(repeat, 5)):
+            out = subprocess.run([sys.executable, "-c", probe], cwd=REPO_ROOT, check=True,
+                                 capture_output=True, text=True).stdout.split()
+            best = min(best, float(out[0]))
+        results.append(result("import_time", {"import": label}, best * 1000, "ms"))
+        results.append(result("import_loads_numpy", {"import": label}, int(out[1]), "bool"))
+    return results
+
+
+def run_all(sizes, repeat, only=None):
+    suites = {
+        "import": lambda: bench_import(repeat),
+        "typer": lambda: bench_typer_run(sizes, repeat),
+        "memory": lambda: bench_history_memory(sizes),
+        "keyboard": lambda: bench_keyboard(repeat),
+        "montecarlo": lambda: bench_monte_carlo(sizes),
+        "dispatch": lambda: bench_dispatch(sizes, repeat),
+    }
+    results = []
+    for name, suite in suites.items():
+        if only and name not in only:
+            continue
+        print(f"Running {name} benchmarks...", file=sys.stderr)
+        results.extend(suite())
+    return results
+
+
+def _key(entry):
+    return entry["name"], json.dumps(entry["params"], sort_keys=True)
+
+
+def compare(results, baseline, tolerance):
+    """Prints each result against the baseline; returns the regressed entries."""
+    previous = {_key(entry): entry for entry in baseline["results"]}
+    regressions = []
+    print(f"\n{'benchmark':<60} {'baseline':>12} {'current':>12} {'change':>8}")
+    for entry in results:
+        old = previous.get(_key(entry))
+        label = f"{entry['name']} {json.dumps(entry['params'], sort_keys=True)}"
+        if old is None:
+            print(f"{label:<60} {'-':>12} {entry['value']:>12.4g}      new")
+            continue
+        if old["value"]:
+            change = entry["value"] / old["value"] - 1
+        else:
+            change = float("inf") if entry["value"] > 0 else 0.0
+        worse = change > tolerance if entry["better"] == "lower" else change < -tolerance
+        flag = "  REGRESSION" if worse else ""
+        print(f"{label:<60} {old['value']:>12.4g} {entry['value']:>12.4g} {change:>+8.1%}{flag}")
+        if worse:
+            regressions.append(entry)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HumanTyping benchmark suite")
+    parser.add_argument("--sizes", type=lambda s: tuple(int(x) for x in s.split(",")), default=SIZES,
+                        help="Comma-separated text sizes in bytes")
+    parser.add_argument("--quick", action="store_true", help=f"Only run sizes {QUICK_SIZES}")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per timing (best is kept)")
+    parser.add_argument("--only", nargs="+", choices=["import", "typer", "memory", "keyboard", "montecarlo", "dispatch"],
+                        help="Run only these benchmark groups")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a JSON file written by --output")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown vs the baseline")
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_SIZES if args.quick else args.sizes
+    results = run_all(sizes, args.repeat, args.only)
+    report = {
+        "meta": {
+            "humantyping": humantyping.__version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""In-process stand-ins for Playwright elements and Selenium/Appium drivers."""
+import asyncio
+from contextlib import contextmanager
+from unittest import mock
+
+# Kept before any patching, so virtual sleeps can still yield to the loop
+_real_async_sleep = asyncio.sleep
+
+
+class VirtualClock:
+    """
+    Virtual time for asyncio playback: `asyncio.sleep` returns at once and
+    advances the clock instead, and the running loop's `time()` reads it.
+    Deadlines, latencies and typing delays then play out exactly, at CPU speed.
+    Only for code that waits with asyncio.sleep (no loop timers such as wait_for).
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    async def sleep(self, delay, result=None):
+        if delay > 0:
+            self.now += delay
+        await _real_async_sleep(0)
+        return result
+
+    @contextmanager
+    def patch(self):
+        with mock.patch.object(asyncio, "sleep", self.sleep):
+            yield self
+
+    def run(self, coro):
+        """Runs a coroutine to completion in virtual time (like asyncio.run)."""
+        async def main():
+            asyncio.get_running_loop().time = self.time
+            return await coro
+
+        with self.patch():
+            return asyncio.run(main())
+
+
+class FakeLocator:
+    """
+    Async Playwright-like element that records what it receives.
+
+    Each call takes `latency` seconds (the driver round-trip) before its keys
+    land. Like Playwright's `type(text, delay=...)`, each character is held for
+    `delay` ms (keydown, wait, keyup), so key i lands i * delay after the first
+    and the call returns len(text) * delay after it. Landed keys are kept with
+    the loop time they landed at in `keys`, and the resulting field content in
+    `text`. `page` groups locators by page for SessionScheduler.
+    """
+
+    def __init__(self, latency=0.0, page=None):
+        self.latency = latency
+        self.page = page
+        self.calls = 0
+        self.text = []
+        self.keys = []
+
+    async def _round_trip(self):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _land(self, key):
+        self.keys.append((asyncio.get_running_loop().time(), key))
+
+    async def type(self, text, delay=0):
+        await self._round_trip()
+        for char in text:
+            self._land(char)
+            self.text.append(char)
+            if delay:
+                await asyncio.sleep(delay / 1000)
+
+    async def press(self, key):
+        await self._round_trip()
+        self._land(key)
+        if key == "Backspace" and self.text:
+            self.text.pop()
+
+
+class FakeDriver:
+    """
+    Selenium/Appium-like driver: accepts W3C action payloads and scripts.
+    With record=True every payload and script call is kept.
+    """
+
+    def __init__(self, record=False):
+        self.calls = 0
+        self.keys = 0
+        self.record = record
+        self.payloads = []
+        self.scripts = []
+
+    def execute(self, command, params=None):
+        self.calls += 1
+        if self.record:
+            self.payloads.append(params)
+        for device in (params or {}).get("actions", ()):
+            for action in device.get("actions", ()):
+                if action.get("type") == "keyDown":
+                    self.keys += 1
+        return {"value": None}
+
+    def execute_script(self, script, *args):
+        self.calls += 1
+        if self.record:
+            self.scripts.append((script, args))
+
+
+class FakeWebElement:
+    """Selenium-like WebElement with send_keys, attached to a FakeDriver."""
+
+    def __init__(self, driver=None):
+        self.parent = driver or FakeDriver()
+        self.calls = 0
+
+    def send_keys(self, *keys):
+        self.calls += 1
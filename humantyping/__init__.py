@@ -42,12 +42,11 @@ For more information, see the documentation at:
 https://github.com/Lax3n/HumanTyping
 """
 
-__version__ = "1.0.0"
+# Single source of the package version (read by the build, see pyproject.toml)
+__version__ = "1.0.2"
 __author__ = "HumanTyping Contributors"
 __license__ = "MIT"
 
-from .integration import HumanTyper
-from .typer import MarkovTyper
 from .config import (
     DEFAULT_WPM,
     PROB_ERROR,
@@ -56,9 +55,49 @@ from .config import (
     SPEED_BOOST_BIGRAM,
 )
 
+# Public names and the submodule defining them, imported by __getattr__
+_LAZY_IMPORTS = {
+    "HumanTyper": ".integration",
+    "PlanCache": ".cache",
+    "save_plan": ".plan",
+    "load_plan": ".plan",
+    "TyperMetrics": ".instrumentation",
+    "MarkovTyper": ".typer",
+    "estimate_duration": ".estimate",
+}
+
+
+def __getattr__(name):
+    """
+    Imports public names on first access.
+
+    `import humantyping` only loads the config, so CLIs, plan replay and tools
+    that never simulate start fast and do not need numpy at import time. For
+    the same reason the simulator modules import numpy inside the functions
+    that use it, so even importing MarkovTyper or HumanTyper does not load it
+    until a typer is built.
+    """
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
 __all__ = [
     "HumanTyper",
+    "PlanCache",
+    "save_plan",
+    "load_plan",
+    "TyperMetrics",
     "MarkovTyper",
+    "estimate_duration",
     "DEFAULT_WPM",
     "PROB_ERROR",
     "PROB_SWAP_ERROR",
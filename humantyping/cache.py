@@ -0,0 +1,143 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from .plan import build_plan
+
+# Default in-memory budget (a plan costs PLAN_DTYPE.itemsize = 13 bytes per event)
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class PlanCache:
+    """
+    LRU cache of pre-generated typing plans.
+
+    Plans are keyed by (text, wpm, layout, seed, variant) and stored as
+    PLAN_DTYPE structured arrays (see TypingHistory.to_array). The in-memory
+    tier evicts least recently used plans once their total size exceeds
+    `max_bytes`; with `cache_dir` set, plans are also written there as .npy
+    files and reloaded on a memory miss, so they survive the process.
+
+    Each text gets a pool of `variants` plans handed out in rotation, so
+    repeated calls do not replay the exact same keystrokes. Variant `i` is
+    generated from `SeedSequence(seed, spawn_key=(i,))`, so a seeded pool is
+    reproducible, including across processes sharing a `cache_dir`.
+
+    Usage:
+        cache = PlanCache(max_bytes=16 * 2**20, variants=5, cache_dir=".plans")
+        typer = HumanTyper(wpm=70, seed=42, cache=cache)
+        await typer.type(locator, "user@example.com")
+        print(cache.hits, cache.misses, cache.evictions)
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES, variants=1, cache_dir=None):
+        if variants < 1:
+            raise ValueError("variants must be >= 1")
+        self.max_bytes = max_bytes
+        self.variants = variants
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self.nbytes = 0
+        self._plans = OrderedDict()
+        self._rotation = {}
+        self._lock = threading.Lock()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._plans)
+
+    def stats(self):
+        """Returns the counters as a dict."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_hits": self.disk_hits,
+            "entries": len(self._plans),
+            "bytes": self.nbytes,
+        }
+
+    def clear(self):
+        """Drops the in-memory tier (files in cache_dir are kept)."""
+        with self._lock:
+            self._plans.clear()
+            self._rotation.clear()
+            self.nbytes = 0
+
+    def next_plan(self, text, wpm, layout="qwerty", seed=None):
+        """Returns the next plan of the text's variant pool, in rotation."""
+        base = (text, wpm, layout, seed)
+        with self._lock:
+            variant = self._rotation.get(base, 0)
+            self._rotation[base] = (variant + 1) % self.variants
+        return self.get(text, wpm, layout, seed, variant)
+
+    def get(self, text, wpm, layout="qwerty", seed=None, variant=0):
+        """Returns the plan for one key, generating (and caching) it on a miss."""
+        key = (text, wpm, layout, seed, variant)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+
+        plan = self._load(key)
+        if plan is None:
+            plan = self._generate(key)
+            self._save(key, plan)
+        else:
+            with self._lock:
+                self.disk_hits += 1
+        self._store(key, plan)
+        return plan
+
+    def _generate(self, key):
+        text, wpm, layout, seed, variant = key
+        seed_seq = np.random.SeedSequence(seed, spawn_key=(variant,))
+        plan = build_plan(text, wpm, layout, seed_seq)
+        plan.flags.writeable = False
+        return plan
+
+    def _store(self, key, plan):
+        if plan.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._plans:
+                return
+            self._plans[key] = plan
+            self.nbytes += plan.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._plans.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+
+    def _path(self, key):
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest + ".npy")
+
+    def _load(self, key):
+        if self.cache_dir is None:
+            return None
+        try:
+            plan = np.load(self._path(key), allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        plan.flags.writeable = False
+        return plan
+
+    def _save(self, key, plan):
+        if self.cache_dir is None:
+            return
+        path = self._path(key)
+        # Write then rename, so concurrent readers never see a partial file
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, plan, allow_pickle=False)
+        os.replace(tmp, path)
@@ -0,0 +1,139 @@
+import math
+from dataclasses import dataclass
+from .config import *
+from .keyboard import get_layout
+from .language import build_word_index
+
+# Keys typed past a mistake before it is noticed: none with probability
+# PROB_NOTICE_ERROR, else 1 + 0.2 + 0.2^2 + ... (noticed with 0.8 per further key).
+# The mistaken key and those keys are erased and typed again.
+_DRIFT_TAIL = 1 - PROB_NOTICE_ERROR
+EXPECTED_DRIFT = _DRIFT_TAIL / 0.8
+# Moments of u = 1 + drift, the number of keys erased per mistake
+_U_MEAN = 1 + EXPECTED_DRIFT
+_U_SQ_MEAN = 1 + 2 * EXPECTED_DRIFT + _DRIFT_TAIL * (2 - 0.8) / 0.8 ** 2
+
+# Word-difficulty factors applied by MarkovTyper (time, error probability)
+_TIME_FACTORS = {"common": SPEED_BOOST_COMMON_WORD, "complex": SPEED_PENALTY_COMPLEX_WORD}
+_ERROR_FACTORS = {"common": 0.5, "complex": 1.5}
+
+
+@dataclass
+class DurationEstimate:
+    """Expected duration of a typing session and its variance, from estimate_duration()."""
+    mean: float
+    variance: float
+    keystrokes: float
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+def _mistake_probabilities(text, keyboard, difficulties):
+    """Per-position probability that the first attempt is a swap or an error."""
+    probabilities = []
+    for pos, char in enumerate(text):
+        p_error = PROB_ERROR * _ERROR_FACTORS.get(difficulties[pos], 1.0)
+        if keyboard.is_composed_accent(char):
+            p_error *= 2.0
+        p_swap = 0.0
+        if pos + 1 < len(text) and text[pos + 1] != ' ' and text[pos + 1] != char:
+            p_swap = PROB_SWAP_ERROR
+        probabilities.append(p_swap + (1 - p_swap) * p_error)
+    return probabilities
+
+
+def expected_keystrokes(text, layout="qwerty"):
+    """
+    Expected number of keys typed (including mistakes and retyped keys) for each
+    position of `text`, as a list, from the same per-position swap and error
+    probabilities as MarkovTyper.
+    """
+    _, _, difficulties = build_word_index(text)
+    return [1 + p * _U_MEAN for p in _mistake_probabilities(text, get_layout(layout), difficulties)]
+
+
+def _session_base_moments(wpm):
+    """E[b] and E[b^2] of the base keystroke time b = 60 / (W * AVG_WORD_LENGTH), W = max(10, N(wpm, WPM_STD))."""
+    # Midpoint rule over +-8 standard deviations of the session WPM
+    n = 2000
+    width = 16.0 / n
+    m1 = m2 = 0.0
+    for k in range(n):
+        z = -8.0 + (k + 0.5) * width
+        weight = math.exp(-0.5 * z * z) / math.sqrt(2 * math.pi) * width
+        b = 60 / (max(10, wpm + WPM_STD * z) * AVG_WORD_LENGTH)
+        m1 += weight * b
+        m2 += weight * b * b
+    return m1, m2
+
+
+def estimate_duration(text, wpm=DEFAULT_WPM, layout="qwerty"):
+    """
+    Expected total time of `MarkovTyper(text, wpm, layout).run()` and its variance,
+    in one deterministic O(n) pass, without simulating.
+
+    Each position costs one keystroke, `b * F * word_factor * transition + penalty`
+    as in MarkovTyper._calculate_keystroke_time, where b is the session's base time
+    (random through the session WPM) and F the fatigue after the expected number
+    of keys typed so far. With the position's swap/error probability the attempt is
+    a mistake: the wrong key and the keys typed before noticing it (drift) cost
+    extra keystrokes, one reaction time and as many backspaces.
+
+    The session time is T = b * A + B, with A the fatigue-weighted keystroke
+    multipliers and B the additive times, so the variance combines the session-WPM
+    spread, the per-key timing noise and the randomness of mistakes. Second-order
+    effects (mistakes during drift, the 20 ms keystroke floor, forced corrections
+    at separators) are ignored.
+    """
+    keyboard = get_layout(layout)
+    _, _, difficulties = build_word_index(text)
+    mistakes = _mistake_probabilities(text, keyboard, difficulties)
+
+    log_fatigue = math.log(FATIGUE_FACTOR)
+    reaction = TIME_REACTION_MEAN
+    mean_a = var_a = mean_b = var_b = cov_ab = 0.0
+    keys_typed = 0.0
+    prev = None
+    for pos, char in enumerate(text):
+        p = mistakes[pos]
+
+        # Multiplier of b for one keystroke of this char (fatigue grows before the key)
+        fatigue = math.exp(log_fatigue * (keys_typed + 1))
+        a0 = fatigue * _TIME_FACTORS.get(difficulties[pos], 1.0)
+        if prev is not None:
+            a0 *= keyboard.transition_cost(prev, char)
+
+        # Additive time of one keystroke and its own noise
+        noise = TIME_KEYSTROKE_STD ** 2
+        if char == ' ':
+            s0 = TIME_SPACE_PAUSE_MEAN
+            noise += TIME_SPACE_PAUSE_STD ** 2
+        elif keyboard.is_composed_accent(char):
+            s0 = TIME_COMPOSED_ACCENT_PENALTY
+        elif keyboard.is_direct_accent(char):
+            s0 = TIME_DIRECT_ACCENT_PENALTY
+        elif char.isupper():
+            s0 = TIME_UPPERCASE_PENALTY
+        else:
+            s0 = 0.0
+
+        # A mistake (probability p) erases u keys: u extra keystrokes, u backspaces, one reaction
+        k = s0 + TIME_BACKSPACE_MEAN
+        mean_a += a0 * (1 + p * _U_MEAN)
+        var_a += a0 * a0 * (p * _U_SQ_MEAN - (p * _U_MEAN) ** 2)
+        mean_b += s0 + p * (reaction + k * _U_MEAN)
+        cost_sq = reaction * reaction + 2 * reaction * k * _U_MEAN + k * k * _U_SQ_MEAN
+        var_b += p * cost_sq - (p * (reaction + k * _U_MEAN)) ** 2
+        var_b += noise * (1 + p * _U_MEAN)
+        var_b += p * (TIME_REACTION_STD ** 2 + _U_MEAN * TIME_BACKSPACE_STD ** 2)
+        cov_ab += a0 * (p * (reaction * _U_MEAN + k * _U_SQ_MEAN) - p * p * _U_MEAN * (reaction + k * _U_MEAN))
+
+        keys_typed += 1 + p * _U_MEAN
+        prev = char
+
+    b1, b2 = _session_base_moments(wpm)
+    mean = b1 * mean_a + mean_b
+    variance = b2 * var_a + (b2 - b1 * b1) * mean_a ** 2 + var_b + 2 * b1 * cov_ab
+    return DurationEstimate(mean=mean, variance=variance, keystrokes=keys_typed)
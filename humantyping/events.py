@@ -0,0 +1,16 @@
+from enum import IntEnum
+
+
+class EventKind(IntEnum):
+    """Kind of a keystroke event, as stored in TypingHistory and plan arrays."""
+    INIT = 0
+    TYPED = 1
+    TYPED_ERROR = 2
+    TYPED_SWAP = 3
+    BACKSPACE = 4
+    ARROW_LEFT = 5
+    ARROW_RIGHT = 6
+
+
+# Kinds that type one character (the key)
+TYPING_KINDS = frozenset((EventKind.TYPED, EventKind.TYPED_ERROR, EventKind.TYPED_SWAP))
@@ -0,0 +1,191 @@
+import logging
+import time
+from dataclasses import dataclass, fields, asdict
+from .events import EventKind
+
+
+@dataclass(slots=True)
+class TyperMetrics:
+    """
+    Counters and phase timings collected from instrumented typers.
+
+    Both engines count the same things, per simulated session:
+
+    - runs: sessions simulated; steps: keystrokes + backspaces
+    - swaps / errors: keystrokes that were a swapped or a mistaken key
+    - rng_draws: random variates the session's path uses (session speed,
+      notice checks, reaction/backspace/keystroke/space times, swap and error
+      checks, neighbor picks), as MarkovTyper draws them
+    - word_lookups: word-difficulty lookups, one for the error probability of
+      each non-swap keystroke and one for the time of every keystroke
+    - distance_lookups: key transition-cost lookups, one per keystroke that
+      follows another key
+
+    `monitor_time` is the time spent in the monitoring & correction phase and
+    `typing_time` the time spent in the typing phase, in seconds of wall time.
+    Metrics from several runs (or Monte Carlo chunks) add up with `merge`.
+    """
+    runs: int = 0
+    steps: int = 0
+    keystrokes: int = 0
+    backspaces: int = 0
+    swaps: int = 0
+    errors: int = 0
+    rng_draws: int = 0
+    word_lookups: int = 0
+    distance_lookups: int = 0
+    monitor_time: float = 0.0
+    typing_time: float = 0.0
+
+    def merge(self, other):
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+        return self
+
+    def as_dict(self):
+        return asdict(self)
+
+
+class LoggingSink:
+    """Sink that logs each metrics record."""
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger("humantyping")
+        self.level = level
+
+    def __call__(self, metrics):
+        self.logger.log(self.level, "typing metrics: %s", metrics.as_dict())
+
+
+class PrometheusSink:
+    """
+    Sink that adds each metrics record to prometheus_client counters
+    (`<namespace>_<field>_total`, timings in seconds).
+    """
+
+    def __init__(self, registry=None, namespace="humantyping"):
+        try:
+            from prometheus_client import Counter, REGISTRY
+        except ImportError as exc:
+            raise ImportError("PrometheusSink requires prometheus_client: pip install prometheus-client") from exc
+        registry = REGISTRY if registry is None else registry
+        self.counters = {
+            f.name: Counter(f.name, f"HumanTyping {f.name.replace('_', ' ')}", namespace=namespace,
+                            unit="seconds" if f.name.endswith("_time") else "", registry=registry)
+            for f in fields(TyperMetrics)
+        }
+
+    def __call__(self, metrics):
+        for name, counter in self.counters.items():
+            counter.inc(getattr(metrics, name))
+
+
+class _CountingRNG:
+    """BlockRNG proxy that counts draws."""
+
+    __slots__ = ("rng", "metrics")
+
+    def __init__(self, rng, metrics):
+        self.rng = rng
+        self.metrics = metrics
+
+    def random(self):
+        self.metrics.rng_draws += 1
+        return self.rng.random()
+
+    def normal(self, mean=0.0, std=1.0):
+        self.metrics.rng_draws += 1
+        return self.rng.normal(mean, std)
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+
+class _CountingKeyboard:
+    """KeyboardLayout proxy that counts transition-cost lookups."""
+
+    def __init__(self, keyboard, metrics):
+        self._keyboard = keyboard
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        return getattr(self._keyboard, name)
+
+    def transition_cost(self, prev_char, char):
+        self._metrics.distance_lookups += 1
+        return self._keyboard.transition_cost(prev_char, char)
+
+
+def instrument(typer, metrics=None, sinks=()):
+    """
+    Instruments one MarkovTyper in place.
+
+    Counting proxies and timed phase wrappers are installed as instance
+    attributes, so typers that are not instrumented run the plain methods.
+    Each run is recorded into a fresh `typer.metrics`; when it ends the record
+    is passed to every sink and, if given, added to the shared `metrics`.
+    """
+    run_metrics = TyperMetrics()
+    typer.metrics = run_metrics
+    typer.metrics_total = metrics
+    typer.metrics_sinks = tuple(sinks or ())
+
+    typer.rng = _CountingRNG(typer.rng, run_metrics)
+    # The session speed was drawn in MarkovTyper.__init__, before the proxy
+    run_metrics.rng_draws += 1
+    typer.keyboard = _CountingKeyboard(typer.keyboard, run_metrics)
+
+    step = typer.step
+    monitor = typer._monitor_and_correct
+    type_next = typer._type_next
+    word_difficulty = typer._get_current_word_difficulty
+    clock = time.perf_counter
+
+    def counted_step():
+        event = step()
+        if event is not None:
+            run_metrics.steps += 1
+            kind = event[1]
+            if kind == EventKind.BACKSPACE:
+                run_metrics.backspaces += 1
+            else:
+                run_metrics.keystrokes += 1
+                if kind == EventKind.TYPED_SWAP:
+                    run_metrics.swaps += 1
+                elif kind == EventKind.TYPED_ERROR:
+                    run_metrics.errors += 1
+        return event
+
+    def timed_monitor():
+        start = clock()
+        try:
+            return monitor()
+        finally:
+            run_metrics.monitor_time += clock() - start
+
+    def timed_type_next():
+        start = clock()
+        try:
+            return type_next()
+        finally:
+            run_metrics.typing_time += clock() - start
+
+    def counted_word_difficulty():
+        run_metrics.word_lookups += 1
+        return word_difficulty()
+
+    typer.step = counted_step
+    typer._monitor_and_correct = timed_monitor
+    typer._type_next = timed_type_next
+    typer._get_current_word_difficulty = counted_word_difficulty
+    return run_metrics
+
+
+def finish_run(typer):
+    """Closes the current run of an instrumented typer: notifies sinks and updates the total."""
+    metrics = typer.metrics
+    metrics.runs += 1
+    if typer.metrics_total is not None:
+        typer.metrics_total.merge(metrics)
+    for sink in typer.metrics_sinks:
+        sink(metrics)
@@ -1,6 +1,30 @@
+import os
+import math
 import time
 import asyncio
-from .typer import MarkovTyper
+from itertools import islice
+from .playback import PlaybackClock, dispatch_playwright
+from .events import EventKind, TYPING_KINDS
+
+# Keystrokes per W3C action sequence in batch mode (one perform() per chunk)
+W3C_BATCH_KEYS = 500
+# Texts at least this long are planned in an executor by type(), off the event loop
+OFFLOAD_CHARS = 1000
+# Leading characters of such texts simulated on the loop, so typing starts at once
+STREAM_HEAD_CHARS = 200
+
+
+def _pause_seconds(ms):
+    """
+    Seconds to pass to a W3C pause action so it is encoded as exactly `ms`.
+
+    Selenium encodes pauses as int(seconds * 1000), which truncates some
+    quotients (1001 / 1000 * 1000 < 1001); those get the next float up.
+    """
+    seconds = ms / 1000
+    if int(seconds * 1000) < ms:
+        seconds = math.nextafter(seconds, math.inf)
+    return seconds
 
 
 class HumanTyper:
@@ -8,9 +32,138 @@ class HumanTyper:
     A helper class to integrate realistic typing into automation frameworks like Playwright, Selenium, or Appium.
     """
 
-    def __init__(self, wpm=60.0, layout="qwerty"):
+    def __init__(self, wpm=60.0, layout="qwerty", seed=None, coalesce=False, cache=None,
+                 executor=None, offload_threshold=OFFLOAD_CHARS):
+        """
+        Args:
+            wpm: Target typing speed (Words Per Minute).
+            layout: Keyboard layout name ("qwerty" or "azerty").
+            seed: Optional seed. Each call gets its own child stream spawned from it,
+                so a seeded HumanTyper replays the same sequence of plans.
+            coalesce: Playwright only. Merge runs of typed characters planned closer
+                together than the measured driver round-trip into one
+                `type(text, delay=...)` call. Pauses and corrections stay individual.
+            cache: Optional PlanCache. Plans are then taken from its pool of
+                pre-generated variants instead of being simulated on every call.
+            executor: concurrent.futures executor used by `prepare()` and for long
+                texts (None = the event loop's default thread pool). A
+                ProcessPoolExecutor keeps planning off the GIL as well.
+            offload_threshold: Texts with at least this many characters are mostly
+                planned in the executor by `type()`/`type_many()` instead of being
+                simulated on the event loop while they are typed (see _stream_long).
+        """
         self.wpm = wpm
         self.layout = layout
+        self.seed = seed
+        self.coalesce = coalesce
+        self.cache = cache
+        self.executor = executor
+        self.offload_threshold = offload_threshold
+        import numpy as np
+        self._seed_seq = np.random.SeedSequence(seed)
+        # Plans started by prepare() and not yet typed, per text, oldest first
+        self._prepared = {}
+
+    def _new_typer(self, text):
+        from .typer import MarkovTyper
+        seed = self._seed_seq.spawn(1)[0]
+        return MarkovTyper(text, target_wpm=self.wpm, layout=self.layout, seed=seed)
+
+    def _submit(self, text):
+        """Starts computing a plan for `text` in the executor; returns an asyncio future."""
+        from concurrent.futures import ProcessPoolExecutor
+        from .plan import build_plan
+
+        loop = asyncio.get_running_loop()
+        if self.cache is not None:
+            # The cache lives in this process, so it is only ever used from threads
+            executor = None if isinstance(self.executor, ProcessPoolExecutor) else self.executor
+            return loop.run_in_executor(executor, self.cache.next_plan, text, self.wpm, self.layout, self.seed)
+        seed = self._seed_seq.spawn(1)[0]
+        return loop.run_in_executor(self.executor, build_plan, text, self.wpm, self.layout, seed)
+
+    def prepare(self, text):
+        """
+        Starts planning `text` in the executor, without blocking the event loop.
+
+        Must be called from a coroutine. The returned future resolves to the plan
+        (a PLAN_DTYPE array); the next `type()` of the same text waits for it and
+        plays it instead of simulating again.
+
+        Example:
+            typer.prepare("A long message ...")
+            await page.goto(url)  # planning runs meanwhile
+            await typer.type(page.locator("#msg"), "A long message ...")
+        """
+        future = self._submit(text)
+        self._prepared.setdefault(text, []).append(future)
+        return future
+
+    async def _plan_events(self, text):
+        """Events for `text`: a prepared plan, a plan computed off the loop for long texts, or a live stream."""
+        from .plan import iter_plan
+
+        prepared = self._prepared.get(text)
+        if prepared:
+            future = prepared.pop(0)
+            if not prepared:
+                del self._prepared[text]
+            return iter_plan(await future)
+        if len(text) >= self.offload_threshold:
+            if self.cache is not None:
+                # Cached plans are whole sessions; a miss is planned before typing starts
+                return iter_plan(await self._submit(text))
+            return self._stream_long(text)
+        return self._events(text)
+
+    def _stream_long(self, text):
+        """
+        Events for a long text, planned in the executor without delaying the first key.
+
+        About STREAM_HEAD_CHARS leading characters (cut at a word boundary) are
+        simulated right away, and the rest of the session is planned in the executor
+        from where the head ends (session speed, fatigue, last key) while the head
+        is typed. Should the rest not be ready when the head runs out, it is
+        simulated live from the same seed and state instead, so the events never
+        depend on how fast the executor is.
+        """
+        from .plan import build_plan
+        from .simulation import split_text
+
+        # Only the prefix needs scanning to find the first cut
+        head = split_text(text[:STREAM_HEAD_CHARS + 1], STREAM_HEAD_CHARS)[0]
+        rest = text[len(head):]
+        typer = self._new_typer(head)
+        head_events = list(typer.iter_events())
+        state = {"session_wpm": typer.session_wpm, "fatigue_multiplier": typer.state.fatigue_multiplier,
+                 "last_char_typed": typer.state.last_char_typed}
+        seed = self._seed_seq.spawn(1)[0]
+        future = asyncio.get_running_loop().run_in_executor(
+            self.executor, build_plan, rest, self.wpm, self.layout, seed, state)
+        return self._join_rest(head_events, future, rest, seed, state)
+
+    def _join_rest(self, head_events, future, rest, seed, state):
+        from .plan import iter_plan
+        from .typer import MarkovTyper
+
+        yield from head_events
+        if future.done() and not future.cancelled() and future.exception() is None:
+            events = iter_plan(future.result())
+        else:
+            future.cancel()
+            typer = MarkovTyper(rest, target_wpm=self.wpm, layout=self.layout, seed=seed)
+            typer.carry_over(**state)
+            events = typer.iter_events()
+        offset = head_events[-1][0]
+        for t, kind, key in events:
+            yield t + offset, kind, key
+
+    def _events(self, text):
+        """Yields the (time, kind, key) events of a plan for `text`, cached or simulated."""
+        if self.cache is None:
+            return self._new_typer(text).iter_events()
+        from .plan import iter_plan
+        return iter_plan(self.cache.next_plan(text, self.wpm, self.layout, self.seed))
 
     async def type(self, page_element, text):
         """
@@ -26,49 +179,118 @@ class HumanTyper:
             page_element: The Playwright Locator or ElementHandle to type into.
             text: The text to type with human-like behavior.
 
+        Returns:
+            A PlaybackReport with planned vs actual duration and the observed lag.
+
         Example:
             typer = HumanTyper(wpm=70)
             input_box = page.locator("input[name='search']")
             await input_box.click()
             await typer.type(input_box, "Hello world!")
         """
-        # 1. Generate the realistic keystroke sequence
-        typer = MarkovTyper(text, target_wpm=self.wpm, layout=self.layout)
-        _, history = typer.run()
+        # Short texts are simulated on the fly (or read from the cache), so the first
+        # key goes out immediately; prepared texts and most of long ones are planned
+        # in the executor
+        return await self._play(page_element, await self._plan_events(text))
+
+    async def replay(self, page_element, plan):
+        """
+        Plays a pre-computed plan into a Playwright element, without simulating.
+
+        Args:
+            page_element: The Playwright Locator or ElementHandle to type into.
+            plan: Path to a plan file written by `MarkovTyper.export_plan` /
+                `save_plan` (memory-mapped, so large plan libraries load without
+                copying), or a PLAN_DTYPE array.
+
+        Returns:
+            A PlaybackReport, as for `type()`.
+
+        Example:
+            MarkovTyper("Hello world!", target_wpm=70, seed=1).export_plan("hello.npz")
+            ...
+            await typer.replay(input_box, "hello.npz")
+        """
+        from .plan import iter_plan, load_plan
 
-        last_time = 0.0
-        current_text_on_screen = ""
+        if isinstance(plan, (str, os.PathLike)):
+            plan, _ = load_plan(plan)
+        return await self._play(page_element, iter_plan(plan))
 
-        for t, action, content_snapshot in history:
-            # Calculate delay since last action
-            delay = t - last_time
+    async def _play(self, page_element, events):
+        """Plays (time, kind, key) events into a Playwright element on absolute deadlines."""
+        # Each event is due at an absolute deadline, so driver round-trips do not add up
+        clock = PlaybackClock(asyncio.get_running_loop().time)
+        clock.start()
+
+        pending = next(events, None)
+
+        while pending is not None:
+            t, kind, key = pending
+            pending = next(events, None)
+
+            # Coalescing: absorb following keystrokes that are due sooner than a round-trip
+            burst = [key]
+            t_last = t
+            if self.coalesce and kind in TYPING_KINDS:
+                while (pending is not None and pending[1] in TYPING_KINDS
+                       and pending[0] - t_last < clock.latency):
+                    burst.append(pending[2])
+                    t_last = pending[0]
+                    pending = next(events, None)
+
+            delay = clock.delay_until(t)
             if delay > 0:
                 await asyncio.sleep(delay)
-            last_time = t
+            sent_at = clock.now()
 
             # Execute action
-            if "BACKSPACE" in action:
-                await page_element.press("Backspace")
-                current_text_on_screen = current_text_on_screen[:-1]
-            elif "TYPED_ERROR" in action:
-                # Extract the wrong char typed
-                char = action.split("'")[1]
-                await page_element.type(char)
-                current_text_on_screen += char
-            elif "TYPED_SWAP" in action:
-                char = action.split("'")[1]
-                await page_element.type(char)
-                current_text_on_screen += char
-            elif "TYPED" in action:
-                char = action.split("'")[1]
-                await page_element.type(char)
-                current_text_on_screen += char
-            elif "ARROW_LEFT" in action:
-                await page_element.press("ArrowLeft")
-            elif "ARROW_RIGHT" in action:
-                await page_element.press("ArrowRight")
-
-    def type_appium(self, driver, text):
+            busy = 0.0
+            if len(burst) > 1:
+                # Playwright holds every key for `delay` ms, so key i lands i * gap after
+                # the first and the call itself lasts len(burst) * gap on purpose
+                gap = (t_last - t) / (len(burst) - 1)
+                busy = len(burst) * gap
+                await page_element.type("".join(burst), delay=gap * 1000)
+            else:
+                await dispatch_playwright(page_element, kind, key)
+            clock.record(t_last, sent_at, events=len(burst), busy=busy)
+
+        return clock.report()
+
+    async def type_many(self, items, max_per_page=1, max_per_browser=8):
+        """
+        Types several texts concurrently, e.g. into dozens of Playwright pages.
+
+        All plans are interleaved on the current event loop by one SessionScheduler
+        (a single timer heap rather than one sleep loop per field). Keystrokes of the
+        same field stay in order; concurrent dispatches are capped per page and per
+        browser.
+
+        Args:
+            items: Iterable of (page_element, text) pairs.
+            max_per_page: Max dispatches in flight on one page.
+            max_per_browser: Max dispatches in flight on one browser.
+
+        Returns:
+            One PlaybackReport per item, in the same order, with its own lag figures.
+
+        Example:
+            reports = await typer.type_many([
+                (page1.locator("#q"), "first query"),
+                (page2.locator("#q"), "second query"),
+            ])
+        """
+        from .sessions import SessionScheduler
+
+        items = list(items)
+        plans = await asyncio.gather(*(self._plan_events(text) for _, text in items))
+        scheduler = SessionScheduler(max_per_page=max_per_page, max_per_browser=max_per_browser)
+        for (page_element, _), events in zip(items, plans):
+            scheduler.add(page_element, events)
+        return await scheduler.run()
+
+    def type_appium(self, driver, text, batch=False):
         """
         Types text into the focused mobile element using W3C Actions.
         This operates at the driver level and requires the element to be focused.
@@ -76,6 +298,12 @@ class HumanTyper:
         Args:
             driver: The Appium WebDriver.
             text: The text to type.
+            batch: Compile the plan into W3C key-action sequences with the planned
+                pauses and send them with one perform() per W3C_BATCH_KEYS keystrokes,
+                instead of one round-trip per keystroke.
+
+        Returns:
+            A PlaybackReport with planned vs actual duration and the observed lag.
             
         Example:
             typer = HumanTyper(wpm=45)
@@ -83,57 +311,116 @@ class HumanTyper:
             search_box.click() # Ensure focus
             typer.type_appium(driver, "Hello Appium")
         """
+        if batch:
+            return self._type_w3c_batched(driver, text)
+
         from selenium.webdriver.common.action_chains import ActionChains
         from selenium.webdriver.common.keys import Keys
 
-        typer = MarkovTyper(text, target_wpm=self.wpm, layout=self.layout)
-        _, history = typer.run()
-        
-        last_time = 0.0
+        clock = PlaybackClock(time.perf_counter)
+        clock.start()
         
-        for t, action, _ in history:
-            delay = t - last_time
+        for t, kind, key in self._events(text):
+            delay = clock.delay_until(t)
             if delay > 0:
                 time.sleep(delay)
-            last_time = t
+            sent_at = clock.now()
 
             actions = ActionChains(driver)
-            if "BACKSPACE" in action:
+            if kind == EventKind.BACKSPACE:
                 actions.send_keys(Keys.BACK_SPACE)
-            elif "ARROW_LEFT" in action:
+            elif kind == EventKind.ARROW_LEFT:
                 actions.send_keys(Keys.ARROW_LEFT)
-            elif "ARROW_RIGHT" in action:
+            elif kind == EventKind.ARROW_RIGHT:
                 actions.send_keys(Keys.ARROW_RIGHT)
-            elif "TYPED" in action:  # Handles TYPED, TYPED_ERROR, TYPED_SWAP
-                char = action.split("'")[1]
-                actions.send_keys(char)
+            else:  # Handles TYPED, TYPED_ERROR, TYPED_SWAP
+                actions.send_keys(key)
             
             actions.perform()
+            clock.record(t, sent_at)
 
-    def type_sync(self, selenium_element, text):
+        return clock.report()
+
+    def type_sync(self, selenium_element, text, batch=False):
         """
         Types text into a Selenium WebElement (or any sync object with send_keys).
         Note: Selenium send_keys usually appends, so handling backspace might need specific keys.
+        Returns a PlaybackReport with planned vs actual duration and the observed lag.
+
+        With batch=True the element is focused and the plan is sent as W3C key-action
+        sequences (see type_appium), one perform() per W3C_BATCH_KEYS keystrokes.
         """
-        from selenium.webdriver.common.keys import Keys
+        if batch:
+            selenium_element.parent.execute_script("arguments[0].focus();", selenium_element)
+            return self._type_w3c_batched(selenium_element.parent, text)
 
-        typer = MarkovTyper(text, target_wpm=self.wpm, layout=self.layout)
-        _, history = typer.run()
+        from selenium.webdriver.common.keys import Keys
 
-        last_time = 0.0
+        clock = PlaybackClock(time.perf_counter)
+        clock.start()
 
-        for t, action, _ in history:
-            delay = t - last_time
+        for t, kind, key in self._events(text):
+            delay = clock.delay_until(t)
             if delay > 0:
                 time.sleep(delay)
-            last_time = t
+            sent_at = clock.now()
 
-            if "BACKSPACE" in action:
+            if kind == EventKind.BACKSPACE:
                 selenium_element.send_keys(Keys.BACK_SPACE)
-            elif "ARROW_LEFT" in action:
+            elif kind == EventKind.ARROW_LEFT:
                 selenium_element.send_keys(Keys.ARROW_LEFT)
-            elif "ARROW_RIGHT" in action:
+            elif kind == EventKind.ARROW_RIGHT:
                 selenium_element.send_keys(Keys.ARROW_RIGHT)
-            elif "TYPED" in action:  # Handles TYPED, TYPED_ERROR, TYPED_SWAP
-                char = action.split("'")[1]
-                selenium_element.send_keys(char)
+            else:  # Handles TYPED, TYPED_ERROR, TYPED_SWAP
+                selenium_element.send_keys(key)
+            clock.record(t, sent_at)
+
+        return clock.report()
+
+    def _type_w3c_batched(self, driver, text, max_keys=W3C_BATCH_KEYS):
+        """
+        Sends the plan as W3C key actions: keyDown/keyUp per keystroke with
+        `pause` actions carrying the planned gaps, one perform() per chunk of
+        `max_keys` keystrokes. Chunks start on the playback clock's deadlines.
+        """
+        from selenium.webdriver.common.actions.action_builder import ActionBuilder
+        from selenium.webdriver.common.keys import Keys
+
+        special_keys = {
+            EventKind.BACKSPACE: Keys.BACK_SPACE,
+            EventKind.ARROW_LEFT: Keys.ARROW_LEFT,
+            EventKind.ARROW_RIGHT: Keys.ARROW_RIGHT,
+        }
+
+        events = self._events(text)
+
+        clock = PlaybackClock(time.perf_counter)
+        clock.start()
+
+        chunk = list(islice(events, max_keys))
+        while chunk:
+            builder = ActionBuilder(driver)
+            keyboard = builder.key_action
+            t_first = chunk[0][0]
+            # Pauses are whole milliseconds; derive them from rounded absolute times
+            # so truncation does not accumulate over the chunk
+            prev_ms = round(t_first * 1000)
+            for t, kind, key in chunk:
+                t_ms = round(t * 1000)
+                if t_ms > prev_ms:
+                    keyboard.pause(_pause_seconds(t_ms - prev_ms))
+                prev_ms = t_ms
+                key = special_keys.get(kind, key)
+                keyboard.key_down(key).key_up(key)
+            t_last = chunk[-1][0]
+
+            delay = clock.delay_until(t_first)
+            if delay > 0:
+                time.sleep(delay)
+            sent_at = clock.now()
+            builder.perform()
+            clock.record(t_last, sent_at, events=len(chunk), busy=t_last - t_first)
+
+            chunk = list(islice(events, max_keys))
+
+        return clock.report()
@@ -1,14 +1,97 @@
-import numpy as np
+import string
+import threading
+import unicodedata
+from .config import SPEED_BOOST_BIGRAM, SPEED_BOOST_CLOSE_KEYS
+from .language import COMMON_BIGRAMS, is_common_bigram
+
+
+# Process-wide cache of compiled layouts, see get_layout()
+_LAYOUTS = {}
+_LAYOUTS_LOCK = threading.Lock()
+
+
+def get_layout(layout_name="qwerty"):
+    """
+    Returns the shared, compiled KeyboardLayout for `layout_name`.
+
+    Layouts are built once per name and then reused read-only by every typer.
+    """
+    layout = _LAYOUTS.get(layout_name)
+    if layout is None:
+        with _LAYOUTS_LOCK:
+            layout = _LAYOUTS.get(layout_name)
+            if layout is None:
+                layout = KeyboardLayout(layout_name)
+                _LAYOUTS[layout_name] = layout
+    return layout
+
 
 class KeyboardLayout:
+    """
+    A keyboard grid compiled into lookup tables.
+
+    Distances between every pair of keys, the neighbors of every key and the
+    accent-normalization map are computed once at construction; lookups never
+    recompute them. Instances are read-only after construction, so use
+    `get_layout(name)` to share one per layout name across typers and threads.
+    """
+
     def __init__(self, layout_name="qwerty"):
         self.layout_name = layout_name
         self.grid = self._load_layout(layout_name)
         self.pos_map = self._build_pos_map()
         
         # Accents are less common in English, but we keep them for robustness
-        self.direct_accents = set("éèàùç")
-        self.composed_accents = set("âêîôûäëïöü")
+        self.direct_accents = frozenset("éèàùç")
+        self.composed_accents = frozenset("âêîôûäëïöü")
+
+        self._compile()
+
+    def _compile(self):
+        import numpy as np
+
+        self.flat_grid = tuple(c for row in self.grid for c in row)
+
+        # Composed accents are reduced to their base letter (e.g. ê -> e)
+        self.accent_map = {
+            c: ''.join(ch for ch in unicodedata.normalize('NFD', c) if unicodedata.category(ch) != 'Mn')
+            for c in self.composed_accents
+        }
+
+        # All-pairs Euclidean distance between keys, indexed through key_index
+        self.keys = tuple(self.pos_map)
+        self.key_index = {c: i for i, c in enumerate(self.keys)}
+        coords = np.array([self.pos_map[c] for c in self.keys], dtype=float).reshape(-1, 2)
+        diff = coords[:, None, :] - coords[None, :, :]
+        self.distance_matrix = np.sqrt((diff ** 2).sum(axis=-1))
+        self.distance_matrix.flags.writeable = False
+        self._distance_rows = self.distance_matrix.tolist()
+
+        self.neighbor_table = {c: tuple(self._grid_neighbors(c)) for c in self.keys}
+
+        # Transition cost table: time multiplier from the previous char (row) to the next
+        # one (column). Code 0 means "nothing typed yet" and costs 1.0; the alphabet covers
+        # the grid, accents, their uppercase forms and printable ASCII.
+        alphabet = set(self.keys) | self.direct_accents | self.composed_accents
+        alphabet |= {c.upper() for c in alphabet}
+        alphabet |= set(string.printable) - set('\r\x0b\x0c')
+        self.char_codes = {c: i + 1 for i, c in enumerate(sorted(alphabet))}
+        chars = [''] + sorted(self.char_codes, key=self.char_codes.get)
+        key_idx = np.array([self.key_index.get(self.accent_map.get(c, c), -1) for c in chars])
+        on_grid = key_idx >= 0
+        dist = np.full((len(chars), len(chars)), 4.0)
+        dist[np.ix_(on_grid, on_grid)] = self.distance_matrix[np.ix_(key_idx[on_grid], key_idx[on_grid])]
+        lower = np.array([c.lower() for c in chars])
+        bigram = np.zeros_like(dist, dtype=bool)
+        for pair in COMMON_BIGRAMS:
+            bigram |= (lower == pair[0])[:, None] & (lower == pair[1])[None, :]
+        costs = np.where(bigram, SPEED_BOOST_BIGRAM,
+                         np.where((dist < 2.0) & (dist > 0), SPEED_BOOST_CLOSE_KEYS,
+                                  np.where(dist > 4.0, 1.2, 1.0)))
+        costs[0, :] = costs[:, 0] = 1.0
+        self.transition_costs = costs
+        self.transition_costs.flags.writeable = False
+        self._transition_rows = self.transition_costs.tolist()
 
     def _load_layout(self, name):
         if name == "qwerty":
@@ -42,23 +125,7 @@ class KeyboardLayout:
                 mapping[char] = (r, c)
         return mapping
 
-    def get_neighbor_keys(self, char):
-        """Returns the neighboring keys for a given character."""
-        char = char.lower()
-        
-        # Handle special cases (composed accents reduced to their base letter for neighborhood errors?)
-        # For now, if it's a composed accent, no direct neighbor is found in the simple grid
-        # unless the base letter is mapped.
-        if char in self.composed_accents:
-            # Simplifying: error on the base letter
-            # e.g. ê -> e
-            import unicodedata
-            char = ''.join(c for c in unicodedata.normalize('NFD', char) if unicodedata.category(c) != 'Mn')
-
-        if char not in self.pos_map:
-            # If still not found (e.g. unhandled uppercase or special char), search for a random one
-            return []
-        
+    def _grid_neighbors(self, char):
         r, c = self.pos_map[char]
         neighbors = []
         
@@ -75,35 +142,56 @@ class KeyboardLayout:
                 
         return neighbors
 
+    def get_neighbor_keys(self, char):
+        """Returns the neighboring keys for a given character (empty if not on the grid)."""
+        char = char.lower()
+        # Composed accents: error on the base letter (e.g. ê -> e)
+        char = self.accent_map.get(char, char)
+        return self.neighbor_table.get(char, ())
+
     def get_distance(self, char1, char2):
-        """Calculates the Euclidean distance between two keys."""
-        # Normalization for composed accents -> use distance to the base letter
-        # (as the hand is already in the area) or toward the dead key?
-        # Simplifying: distance to the base letter.
-        
-        def normalize(c):
-            if c in self.composed_accents:
-                import unicodedata
-                return ''.join(ch for ch in unicodedata.normalize('NFD', c) if unicodedata.category(ch) != 'Mn')
-            return c
-
-        c1 = normalize(char1)
-        c2 = normalize(char2)
-
-        if c1 not in self.pos_map or c2 not in self.pos_map:
-            return 4.0 
-            
-        r1, c1_pos = self.pos_map[c1]
-        r2, c2_pos = self.pos_map[c2]
-        
-        return np.sqrt((r1 - r2)**2 + (c1_pos - c2_pos)**2)
+        """Returns the Euclidean distance between two keys (4.0 if either is not on the grid)."""
+        # Composed accents use the distance to the base letter (the hand is already in the area)
+        i = self.key_index.get(self.accent_map.get(char1, char1))
+        j = self.key_index.get(self.accent_map.get(char2, char2))
+        if i is None or j is None:
+            return 4.0
+        return self._distance_rows[i][j]
 
-    def get_random_neighbor(self, char):
+    def transition_multiplier(self, prev_char, char):
+        """
+        Keystroke time multiplier for typing `char` right after `prev_char`:
+        bigram burst, close keys, far keys or neutral. Reference used to build
+        `transition_costs`; prefer `transition_cost` in hot loops.
+        """
+        if is_common_bigram(prev_char, char):
+            return SPEED_BOOST_BIGRAM
+        dist = self.get_distance(prev_char, char)
+        if dist < 2.0 and dist > 0:
+            return SPEED_BOOST_CLOSE_KEYS
+        elif dist > 4.0:
+            return 1.2
+        return 1.0
+
+    def transition_cost(self, prev_char, char):
+        """Table lookup of transition_multiplier (computed directly for chars outside the table)."""
+        i = self.char_codes.get(prev_char)
+        j = self.char_codes.get(char)
+        if i is None or j is None:
+            return self.transition_multiplier(prev_char, char)
+        return self._transition_rows[i][j]
+
+    def get_random_neighbor(self, char, rng=None):
+        """Picks a random neighboring key (or any key if none); `rng` is a BlockRNG."""
+        if rng is None:
+            import numpy as np
+            choice = np.random.choice
+        else:
+            choice = rng.choice
         neighbors = self.get_neighbor_keys(char)
         if not neighbors:
-            flat_grid = [c for row in self.grid for c in row]
-            return np.random.choice(flat_grid)
-        return np.random.choice(neighbors)
+            return choice(self.flat_grid)
+        return choice(neighbors)
     
     def is_direct_accent(self, char):
         return char in self.direct_accents
@@ -1,3 +1,5 @@
+from array import array
+
 # List of very common English words
 COMMON_WORDS = {
     "the", "be", "to", "of", "and", "a", "in", "that", "have", "it",
@@ -30,3 +32,36 @@ def get_word_difficulty(word):
 def is_common_bigram(char1, char2):
     bigram = (char1 + char2).lower()
     return bigram in COMMON_BIGRAMS
+
+def build_word_index(text):
+    """
+    Precomputes, for every position of `text`, the span of the word being typed
+    there and its difficulty class.
+
+    A position on a space belongs to the word that ends right before it (an empty
+    span if there is none), matching a left/right scan for ' ' from that position.
+    Returns (starts, ends, difficulties) where difficulties holds the strings
+    returned by get_word_difficulty.
+    """
+    n = len(text)
+    starts = array("l", bytes(n * array("l").itemsize))
+    ends = array("l", bytes(n * array("l").itemsize))
+    difficulties = ["normal"] * n
+    cache = {}
+
+    start = 0
+    for i in range(n + 1):
+        if i < n and text[i] != ' ':
+            continue
+        # text[start:i] is a maximal run of non-space characters (possibly empty)
+        word = text[start:i]
+        difficulty = cache.get(word)
+        if difficulty is None:
+            difficulty = get_word_difficulty(word)
+            cache[word] = difficulty
+        for j in range(start, min(i + 1, n)):
+            starts[j] = start
+            ends[j] = i
+            difficulties[j] = difficulty
+        start = i + 1
+    return starts, ends, difficulties
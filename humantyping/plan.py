@@ -0,0 +1,143 @@
+import os
+import json
+import struct
+import hashlib
+import zipfile
+import numpy as np
+from .events import EventKind
+
+# One record per keystroke event: absolute time (s), EventKind code, key typed ("" if none)
+PLAN_DTYPE = np.dtype([("time", "<f8"), ("kind", "i1"), ("key", "<U1")])
+
+# Version of the .npz plan container written by save_plan
+PLAN_FORMAT_VERSION = 1
+
+# Records converted to Python objects at a time when iterating a plan
+ITER_BLOCK = 4096
+
+# EventKind members indexed by code
+_KINDS = tuple(EventKind)
+
+
+def history_to_array(history):
+    """Packs a TypingHistory into a PLAN_DTYPE structured array."""
+    plan = np.empty(len(history), dtype=PLAN_DTYPE)
+    plan["time"] = np.frombuffer(history.times, dtype="<f8")
+    plan["kind"] = np.frombuffer(history.kinds, dtype="i1")
+    plan["key"] = history.keys
+    return plan
+
+
+def build_plan(text, wpm, layout="qwerty", seed=None, carry_over=None):
+    """
+    Simulates one session and returns its plan (module-level, so process pools can run it).
+    `carry_over` holds MarkovTyper.carry_over arguments, to continue an earlier piece.
+    """
+    # Imported here so loading and replaying plans never imports the simulator
+    from .typer import MarkovTyper
+    typer = MarkovTyper(text, target_wpm=wpm, layout=layout, seed=seed)
+    if carry_over:
+        typer.carry_over(**carry_over)
+    _, history = typer.run()
+    return history.to_array()
+
+
+def iter_plan(plan):
+    """Yields (time, kind, key) records from a PLAN_DTYPE array, skipping INIT."""
+    # Block-wise, so a memory-mapped plan is never materialized as Python objects at once
+    for start in range(0, len(plan), ITER_BLOCK):
+        block = plan[start:start + ITER_BLOCK]
+        times = block["time"].tolist()
+        kinds = block["kind"].tolist()
+        keys = block["key"].tolist()
+        for t, kind, key in zip(times, kinds, keys):
+            if kind != EventKind.INIT:
+                yield t, _KINDS[kind], key
+
+
+def text_hash(text):
+    """Hex SHA-256 of the UTF-8 text, stored in plan headers."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _seed_to_json(seed):
+    if isinstance(seed, np.random.SeedSequence):
+        return {"entropy": seed.entropy, "spawn_key": list(seed.spawn_key)}
+    if seed is None or isinstance(seed, (int, np.integer)):
+        return None if seed is None else int(seed)
+    return repr(seed)
+
+
+def plan_path(path):
+    """File name a plan is stored under: ".npz" is appended if missing, as np.savez does."""
+    path = os.fspath(path)
+    return path if path.endswith(".npz") else path + ".npz"
+
+
+def save_plan(path, plan, text, layout="qwerty", wpm=None, seed=None):
+    """
+    Writes a plan to an uncompressed .npz container and returns its path
+    (".npz" is appended if missing, see `plan_path`).
+
+    The container holds two members: `plan`, the PLAN_DTYPE records, and `meta`,
+    a JSON header with the format version, the SHA-256 of the text, the layout,
+    the target WPM, the seed and the event count. Members are stored, not
+    compressed, so `load_plan` can memory-map the records in place.
+    """
+    plan = np.asarray(plan)
+    if plan.dtype != PLAN_DTYPE:
+        raise ValueError(f"Expected a plan with dtype {PLAN_DTYPE}, got {plan.dtype}")
+    meta = {
+        "version": PLAN_FORMAT_VERSION,
+        "text_sha256": text_hash(text),
+        "layout": layout,
+        "wpm": wpm,
+        "seed": _seed_to_json(seed),
+        "events": len(plan),
+        "duration": float(plan["time"][-1]) if len(plan) else 0.0,
+    }
+    path = plan_path(path)
+    np.savez(path, plan=plan, meta=np.array(json.dumps(meta)))
+    return path
+
+
+def _member_offset(f, info):
+    """Offset of a stored zip member's data (after its local file header)."""
+    f.seek(info.header_offset)
+    local_header = f.read(30)
+    if local_header[:4] != b"PK\x03\x04":
+        raise ValueError("Corrupt plan file: bad zip local header")
+    name_len, extra_len = struct.unpack("<HH", local_header[26:30])
+    return info.header_offset + 30 + name_len + extra_len
+
+
+def load_plan(path, mmap=True):
+    """
+    Reads a plan written by `save_plan` and returns (plan, meta).
+
+    With mmap=True the records are an `np.memmap` over the file: nothing is
+    copied up front and pages are read as the plan is replayed. The path is
+    completed like in `save_plan`, so the same name can be used for both.
+    """
+    path = plan_path(path)
+    with zipfile.ZipFile(path) as zf:
+        meta = json.loads(str(np.lib.format.read_array(zf.open("meta.npy"), allow_pickle=False)))
+        if meta.get("version") != PLAN_FORMAT_VERSION:
+            raise ValueError(f"Unsupported plan format version: {meta.get('version')!r}")
+        info = zf.getinfo("plan.npy")
+        if not mmap or info.compress_type != zipfile.ZIP_STORED:
+            return np.lib.format.read_array(zf.open("plan.npy"), allow_pickle=False), meta
+
+    with open(path, "rb") as f:
+        f.seek(_member_offset(f, info))
+        major, _ = np.lib.format.read_magic(f)
+        if major == 1:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if dtype != PLAN_DTYPE or len(shape) != 1:
+        raise ValueError(f"Corrupt plan file: unexpected records {dtype} {shape}")
+    if shape[0] == 0:
+        return np.empty(0, dtype=PLAN_DTYPE), meta
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape), meta
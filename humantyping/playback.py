@@ -0,0 +1,110 @@
+import time
+from dataclasses import dataclass
+from .events import EventKind
+
+
+async def dispatch_playwright(element, kind, key):
+    """Plays one (kind, key) event on a Playwright Locator or ElementHandle."""
+    if kind == EventKind.BACKSPACE:
+        await element.press("Backspace")
+    elif kind == EventKind.ARROW_LEFT:
+        await element.press("ArrowLeft")
+    elif kind == EventKind.ARROW_RIGHT:
+        await element.press("ArrowRight")
+    else:  # Handles TYPED, TYPED_ERROR, TYPED_SWAP
+        await element.type(key)
+
+
+@dataclass
+class PlaybackReport:
+    """
+    Timing report for one playback.
+
+    Lag is measured per dispatch as (time the dispatch completed) - (planned
+    deadline of its last event); positive values mean the key landed late.
+    """
+    events: int = 0
+    dispatches: int = 0
+    planned_duration: float = 0.0
+    actual_duration: float = 0.0
+    max_lag: float = 0.0
+    total_lag: float = 0.0
+    dispatch_latency: float = 0.0
+
+    @property
+    def mean_lag(self):
+        """Mean lag per dispatch."""
+        return self.total_lag / self.dispatches if self.dispatches else 0.0
+
+    @property
+    def drift(self):
+        """Actual minus planned duration of the whole playback."""
+        return self.actual_duration - self.planned_duration
+
+
+class PlaybackClock:
+    """
+    Absolute-deadline clock for replaying a plan.
+
+    Every event is scheduled at `start + t` rather than after a relative sleep,
+    so time spent inside the driver calls does not accumulate. The clock keeps
+    an exponential moving average of the dispatch latency and fires that much
+    early, so keys land on their deadline; when playback falls behind, the wait
+    is zero and later events catch up on their own.
+
+    Works with any monotonic clock: `time.perf_counter` for sync playback or
+    `loop.time` for asyncio.
+
+    Usage:
+        clock = PlaybackClock(loop.time)
+        clock.start()
+        for t, kind, key in events:
+            delay = clock.delay_until(t)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sent_at = clock.now()
+            await element.type(key)
+            clock.record(t, sent_at)
+        report = clock.report()
+    """
+
+    def __init__(self, clock=time.perf_counter, smoothing=0.2):
+        self.now = clock
+        self.smoothing = smoothing
+        self.latency = 0.0
+        self.t0 = None
+        self._report = PlaybackReport()
+
+    def start(self):
+        self.t0 = self.now()
+        self._report = PlaybackReport()
+
+    def delay_until(self, t):
+        """Seconds to wait before dispatching the event planned at offset `t` (<= 0 if late)."""
+        return self.t0 + t - self.latency - self.now()
+
+    def record(self, t, sent_at, events=1, busy=0.0):
+        """
+        Records a dispatch that started at `sent_at` and just completed.
+
+        `t` is the planned offset of the last event it carried, `events` how many
+        events it carried and `busy` the time the driver was asked to spend inside
+        the call on purpose (e.g. a typing delay), which is not latency.
+        """
+        done_at = self.now()
+        self.latency += self.smoothing * ((done_at - sent_at - busy) - self.latency)
+        lag = done_at - (self.t0 + t)
+        report = self._report
+        report.dispatches += 1
+        report.events += events
+        report.total_lag += lag
+        if report.dispatches == 1 or lag > report.max_lag:
+            report.max_lag = lag
+        report.planned_duration = t
+
+    def report(self):
+        """Finalizes and returns the PlaybackReport."""
+        report = self._report
+        report.actual_duration = self.now() - self.t0
+        report.dispatch_latency = self.latency
+        return report
@@ -0,0 +1,109 @@
+import sys
+import time
+import unicodedata
+from .events import EventKind, TYPING_KINDS
+
+# Default refresh rate of the terminal demo (frames per second)
+DEMO_FPS = 60
+TAB_WIDTH = 8
+
+
+def _char_width(char):
+    """Terminal cells taken by a printable character."""
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+class TerminalRenderer:
+    """
+    Draws typing events on a terminal incrementally.
+
+    Each event is turned into the escape sequence for its delta (the typed
+    character, or erasing the last one) from line/column state kept here,
+    so the cost per event does not depend on the length of the text.
+    Output is buffered and written to the stream once per frame.
+
+    For every line, the start column of each character is kept, so
+    backspacing over tabs, wide characters and newlines puts the cursor back
+    where it was. Lines wider than the terminal (soft wraps) are not tracked.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.column = 0
+        self.starts = []      # start column of each character on the current line
+        self.lines = []       # (end column, starts) of the lines above
+        self.pending = []
+
+    def type(self, key):
+        if key == "\n":
+            self.lines.append((self.column, self.starts))
+            self.starts = []
+            self.column = 0
+            self.pending.append("\n")
+            return
+        self.starts.append(self.column)
+        if key == "\t":
+            self.column += TAB_WIDTH - self.column % TAB_WIDTH
+        else:
+            self.column += _char_width(key)
+        self.pending.append(key)
+
+    def backspace(self):
+        if self.starts:
+            start = self.starts.pop()
+            if self.column - start == 1:
+                self.pending.append("\b \b")
+            else:
+                self.pending.append(f"\033[{start + 1}G\033[K")
+            self.column = start
+        elif self.lines:
+            # Erase the newline: up one line, to the end of what is typed there
+            self.column, self.starts = self.lines.pop()
+            self.pending.append(f"\033[A\033[{self.column + 1}G")
+
+    def apply(self, kind, key):
+        """Buffers the delta of one event (kind, key)."""
+        if kind == EventKind.BACKSPACE:
+            self.backspace()
+        elif kind in TYPING_KINDS:
+            self.type(key)
+
+    def flush(self):
+        """Writes the buffered frame, if any."""
+        if self.pending:
+            self.stream.write("".join(self.pending))
+            self.stream.flush()
+            self.pending.clear()
+
+
+def play(events, renderer, fps=DEMO_FPS, clock=time.perf_counter, sleep=time.sleep):
+    """
+    Replays (t, kind, key) events on `renderer` in real time.
+
+    Events are applied at their simulated times (deadlines from the start, so
+    sleeps do not accumulate drift) but drawn at most `fps` times per second:
+    what is buffered is written as soon as a frame interval has passed since the
+    last one, including while playback is behind schedule, or early before an
+    idle gap. An event is thus shown at most about one frame late. Returns the
+    wall time taken.
+    """
+    interval = 1.0 / fps if fps else 0.0
+    start = last_frame = clock()
+    for t, kind, key in events:
+        deadline = start + t
+        now = clock()
+        if renderer.pending:
+            frame_due = last_frame + interval
+            if frame_due <= now:
+                renderer.flush()
+                last_frame = clock()
+            elif frame_due < deadline:
+                sleep(frame_due - now)
+                renderer.flush()
+                last_frame = clock()
+        now = clock()
+        if deadline > now:
+            sleep(deadline - now)
+        renderer.apply(kind, key)
+    renderer.flush()
+    return clock() - start
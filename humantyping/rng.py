@@ -0,0 +1,53 @@
+class BlockRNG:
+    """
+    Seedable random source for the simulator.
+
+    Wraps a `numpy.random.Generator` and pre-generates uniforms and standard
+    normals in blocks, handing them out one by one as plain Python floats.
+    This avoids the per-call overhead of numpy scalar draws in the hot loop
+    and keeps every typer on its own stream instead of the global RNG.
+
+    Blocks start small (short texts stay cheap) and double on each refill up
+    to `max_block_size`.
+    """
+
+    __slots__ = ("generator", "block_size", "max_block_size",
+                 "_uniforms", "_u_idx", "_normals", "_n_idx")
+
+    def __init__(self, seed=None, block_size=64, max_block_size=8192):
+        # seed may be None, an int, a SeedSequence or an existing Generator
+        import numpy as np
+        self.generator = np.random.default_rng(seed)
+        self.block_size = block_size
+        self.max_block_size = max_block_size
+        self._uniforms = []
+        self._u_idx = 0
+        self._normals = []
+        self._n_idx = 0
+
+    def _grow(self):
+        size = self.block_size
+        self.block_size = min(size * 2, self.max_block_size)
+        return size
+
+    def random(self):
+        """Returns a uniform float in [0, 1)."""
+        if self._u_idx >= len(self._uniforms):
+            self._uniforms = self.generator.random(self._grow()).tolist()
+            self._u_idx = 0
+        u = self._uniforms[self._u_idx]
+        self._u_idx += 1
+        return u
+
+    def normal(self, mean=0.0, std=1.0):
+        """Returns a normal draw with the given mean and standard deviation."""
+        if self._n_idx >= len(self._normals):
+            self._normals = self.generator.standard_normal(self._grow()).tolist()
+            self._n_idx = 0
+        z = self._normals[self._n_idx]
+        self._n_idx += 1
+        return mean + std * z
+
+    def choice(self, seq):
+        """Returns a uniformly chosen element of a non-empty sequence."""
+        return seq[int(self.random() * len(seq))]
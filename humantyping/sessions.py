@@ -0,0 +1,134 @@
+import asyncio
+import heapq
+from .playback import PlaybackClock, dispatch_playwright
+
+
+def _page_of(element):
+    """Page a Playwright element belongs to (the element itself if unknown)."""
+    return getattr(element, "page", None) or element
+
+
+def _browser_of(element):
+    """Browser a Playwright element belongs to (its page if unknown)."""
+    page = _page_of(element)
+    try:
+        return page.context.browser or page
+    except AttributeError:
+        return page
+
+
+class _Session:
+    __slots__ = ("element", "events", "clock", "page", "browser")
+
+    def __init__(self, element, events, clock):
+        self.element = element
+        self.events = events
+        self.clock = clock
+        self.page = _page_of(element)
+        self.browser = _browser_of(element)
+
+
+class SessionScheduler:
+    """
+    Plays many typing plans concurrently on one asyncio event loop.
+
+    All sessions share a single timer heap keyed by absolute deadline: one
+    coroutine sleeps until the earliest due event and launches its dispatch,
+    instead of each session running its own sleep loop. A session has at most
+    one dispatch in flight, so its keystrokes stay ordered, and its next event
+    is simulated only once the previous one has been sent.
+
+    Concurrent dispatches are capped per page and per browser, and every
+    session gets its own PlaybackClock, so lag is reported per session.
+
+    Usage:
+        scheduler = SessionScheduler(max_per_page=1, max_per_browser=8)
+        scheduler.add(locator_a, typer_a.iter_events())
+        scheduler.add(locator_b, typer_b.iter_events())
+        reports = await scheduler.run()
+    """
+
+    def __init__(self, max_per_page=1, max_per_browser=8, dispatch=dispatch_playwright):
+        self.max_per_page = max_per_page
+        self.max_per_browser = max_per_browser
+        self.dispatch = dispatch
+        self._sessions = []
+
+    def add(self, element, events):
+        """Registers a session; `events` yields (time, event_kind, key) tuples."""
+        self._sessions.append((element, events))
+        return len(self._sessions) - 1
+
+    async def run(self):
+        """Plays every session to completion and returns their PlaybackReports, in order."""
+        loop = asyncio.get_running_loop()
+        sessions = [_Session(element, events, PlaybackClock(loop.time)) for element, events in self._sessions]
+        page_limits = {}
+        browser_limits = {}
+        for session in sessions:
+            page_limits.setdefault(id(session.page), asyncio.Semaphore(self.max_per_page))
+            browser_limits.setdefault(id(session.browser), asyncio.Semaphore(self.max_per_browser))
+
+        heap = []
+        counter = 0
+        wake = asyncio.Event()
+        in_flight = set()
+        errors = []
+        reports = [None] * len(sessions)
+
+        def schedule(index):
+            nonlocal counter
+            session = sessions[index]
+            event = next(session.events, None)
+            if event is None:
+                reports[index] = session.clock.report()
+                return
+            deadline = session.clock.t0 + event[0] - session.clock.latency
+            heapq.heappush(heap, (deadline, counter, index, event))
+            counter += 1
+
+        async def fire(index, event):
+            session = sessions[index]
+            t, kind, key = event
+            try:
+                # Page slot first: a session queued behind its page must not hold a browser slot
+                async with page_limits[id(session.page)], browser_limits[id(session.browser)]:
+                    sent_at = session.clock.now()
+                    await self.dispatch(session.element, kind, key)
+                    session.clock.record(t, sent_at)
+                schedule(index)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                in_flight.discard(asyncio.current_task())
+                wake.set()
+
+        for index, session in enumerate(sessions):
+            session.clock.start()
+            schedule(index)
+
+        try:
+            while (heap or in_flight) and not errors:
+                if heap:
+                    delay = heap[0][0] - loop.time()
+                    if delay <= 0:
+                        _, _, index, event = heapq.heappop(heap)
+                        in_flight.add(loop.create_task(fire(index, event)))
+                        continue
+                    try:
+                        await asyncio.wait_for(wake.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await wake.wait()
+                wake.clear()
+        finally:
+            # Also on cancellation: no dispatch may outlive run()
+            pending = list(in_flight)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if errors:
+            raise errors[0]
+        return reports
@@ -1,41 +1,228 @@
+import re
 import numpy as np
-from .typer import MarkovTyper
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .config import FATIGUE_FACTOR, WPM_STD
+from .estimate import expected_keystrokes
+from .typer import MarkovTyper, EventKind
+from .vectorized import VectorizedTyper
+from .stats import StreamingStats
+from .instrumentation import TyperMetrics
+from .render import DEMO_FPS, TerminalRenderer, play
+import os
 import time
 import sys
 
-def run_monte_carlo(target_text, wpm, n_simulations=100):
+# Upper bound on trials x characters simulated at once by the vectorized engine
+VECTORIZED_BATCH_CELLS = 2 ** 24
+# Trials per Monte Carlo chunk (the unit of work handed to a worker process)
+CHUNK_TRIALS = {"vectorized": 20000, "scalar": 500}
+# Target characters per piece when one long text is simulated in chunks
+TEXT_CHUNK_CHARS = 10000
+
+# Sentence end followed by whitespace (closing quotes/brackets stay with the sentence)
+_SENTENCE_END = re.compile(r'[.!?]["\')\]]*\s+')
+
+def _chunk_sizes(text_len, n_simulations, engine):
+    """Splits n_simulations into chunks; the split never depends on the worker count."""
+    size = CHUNK_TRIALS[engine]
+    if engine == "vectorized":
+        size = max(1, min(size, VECTORIZED_BATCH_CELLS // (text_len + 1)))
+    sizes = [size] * (n_simulations // size)
+    if n_simulations % size:
+        sizes.append(n_simulations % size)
+    return sizes
+
+def _simulate_chunk(target_text, wpm, n, seed, engine, hist_edges=None, instrument=False, layout="qwerty"):
+    """
+    Simulates one chunk of trials from its own seed stream and reduces it to
+    StreamingStats (and TyperMetrics if `instrument`, else None).
+    """
+    metrics = TyperMetrics() if instrument else None
+    if engine == "vectorized":
+        times = VectorizedTyper(target_text, target_wpm=wpm, layout=layout, seed=seed).run(n, metrics=metrics)
+    else:
+        times = [MarkovTyper(target_text, target_wpm=wpm, layout=layout, seed=s, metrics=metrics).run()[0]
+                 for s in seed.spawn(n)]
+    stats = StreamingStats(hist_edges)
+    stats.update(times)
+    return stats, metrics
+
+def run_monte_carlo(target_text, wpm, n_simulations=100, seed=None, engine="vectorized", workers=1,
+                    hist_edges=None, verbose=True, instrument=False, sinks=None, layout="qwerty"):
     """
     Runs n_simulations to estimate typing time distribution.
+
+    engine="vectorized" advances all trials in lockstep with numpy (VectorizedTyper),
+    engine="scalar" runs one MarkovTyper per trial. Both sample the same distribution.
+
+    Trials are split into fixed-size chunks, each with its own stream spawned from `seed`.
+    With workers > 1 (or None/0 for one per CPU) chunks run in a process pool. Each chunk is
+    reduced to a constant-size StreamingStats and merged as soon as the chunks before it are
+    in, so seeded results are identical whatever the worker count and memory does not grow
+    with n_simulations.
+
+    Returns a MonteCarloResult (mean, std, min/max, p50/p90/p99/p99.9 and a histogram
+    over `hist_edges`, log-spaced by default).
+
+    With instrument=True (or any `sinks`) the simulator counters and phase timings of all
+    trials are aggregated into `result.metrics` (a TyperMetrics) and passed to each sink.
     """
-    times = []
-    print(f"Running {n_simulations} simulations for text: '{target_text}' (Target WPM: {wpm})")
+    if engine not in CHUNK_TRIALS:
+        raise ValueError(f"Unknown engine: {engine!r}")
+    if not workers:
+        workers = os.cpu_count() or 1
+
+    if verbose:
+        print(f"Running {n_simulations} simulations for text: '{target_text}' (Target WPM: {wpm})")
     
     start_global = time.time()
     
-    for i in range(n_simulations):
-        typer = MarkovTyper(target_text, target_wpm=wpm)
-        total_time, _ = typer.run()
-        times.append(total_time)
+    sizes = _chunk_sizes(len(target_text), n_simulations, engine)
+    chunk_seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    stats = StreamingStats(hist_edges)
+    instrument = bool(instrument or sinks)
+    metrics = TyperMetrics() if instrument else None
+
+    def merge(chunk):
+        chunk_stats, chunk_metrics = chunk
+        stats.merge(chunk_stats)
+        if metrics is not None:
+            metrics.merge(chunk_metrics)
+
+    if workers == 1 or len(sizes) <= 1:
+        for i, n in enumerate(sizes):
+            merge(_simulate_chunk(target_text, wpm, n, chunk_seeds[i], engine, hist_edges, instrument, layout))
+    else:
+        pending = {}
+        next_chunk = 0
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+            futures = {
+                pool.submit(_simulate_chunk, target_text, wpm, n, chunk_seeds[i], engine, hist_edges, instrument,
+                            layout): i
+                for i, n in enumerate(sizes)
+            }
+            for future in as_completed(futures):
+                pending[futures[future]] = future.result()
+                # Merge in chunk order so floating-point sums do not depend on timing
+                while next_chunk in pending:
+                    merge(pending.pop(next_chunk))
+                    next_chunk += 1
         
     end_global = time.time()
+    result = stats.result(computation_time=end_global - start_global)
+    result.metrics = metrics
+    for sink in sinks or ():
+        sink(metrics)
     
-    times = np.array(times)
-    mean_time = np.mean(times)
-    std_time = np.std(times)
-    min_time = np.min(times)
-    max_time = np.max(times)
+    if verbose:
+        print(f"\n--- Monte Carlo Results ---")
+        print(f"Estimated Mean Time : {result.mean:.4f} s")
+        print(f"Standard Deviation  : {result.std:.4f} s")
+        print(f"Min / Max           : {result.min:.4f} s / {result.max:.4f} s")
+        print(f"P50 / P90           : {result.p50:.4f} s / {result.p90:.4f} s")
+        print(f"P99 / P99.9         : {result.p99:.4f} s / {result.p999:.4f} s")
+        print(f"Computation Time    : {result.computation_time:.4f} s")
+        if metrics is not None:
+            print(f"Steps / Trial       : {metrics.steps / max(metrics.runs, 1):.1f} "
+                  f"({metrics.errors} errors, {metrics.swaps} swaps, {metrics.backspaces} backspaces)")
+            print(f"RNG Draws           : {metrics.rng_draws}")
+            print(f"Monitor / Typing    : {metrics.monitor_time:.4f} s / {metrics.typing_time:.4f} s")
     
-    print(f"\n--- Monte Carlo Results ---")
-    print(f"Estimated Mean Time : {mean_time:.4f} s")
-    print(f"Standard Deviation  : {std_time:.4f} s")
-    print(f"Min / Max           : {min_time:.4f} s / {max_time:.4f} s")
-    print(f"Computation Time    : {end_global - start_global:.4f} s")
-    
-    return times
+    return result
+
+def split_text(text, chunk_chars=TEXT_CHUNK_CHARS):
+    """
+    Splits text into consecutive pieces of about `chunk_chars` characters.
 
-def demo_single_run(target_text, wpm):
+    Each cut is placed after a paragraph break if there is one in the second half
+    of the window, else after a sentence end, else after a space, so pieces start
+    on a word. Joining the pieces gives back the text.
+    """
+    pieces = []
+    start = 0
+    while len(text) - start > chunk_chars:
+        lo, hi = start + chunk_chars // 2, start + chunk_chars
+        cut = text.rfind("\n\n", lo, hi)
+        if cut != -1:
+            cut += 2
+            while cut < len(text) and text[cut] == "\n":
+                cut += 1
+        else:
+            sentence_ends = [m.end() for m in _SENTENCE_END.finditer(text, lo, hi)]
+            if sentence_ends:
+                cut = sentence_ends[-1]
+            else:
+                space = text.rfind(" ", lo, hi)
+                cut = space + 1 if space != -1 else hi
+        pieces.append(text[start:cut])
+        start = cut
+    pieces.append(text[start:])
+    return pieces
+
+def _simulate_text_chunk(text, wpm, layout, seed, session_wpm, fatigue, last_char):
+    """Simulates one piece of a chunked session; returns (total_time, plan)."""
+    typer = MarkovTyper(text, target_wpm=wpm, layout=layout, seed=seed)
+    typer.carry_over(session_wpm=session_wpm, fatigue_multiplier=fatigue, last_char_typed=last_char)
+    total_time, history = typer.run()
+    return total_time, history.to_array()
+
+def simulate_chunked(target_text, wpm, layout="qwerty", seed=None, workers=None, chunk_chars=TEXT_CHUNK_CHARS):
+    """
+    Simulates one session of a very long text in parallel and returns (total_time, plan).
+
+    The text is split at paragraph or sentence boundaries (see split_text) and the
+    pieces run in up to `workers` processes (None/0 = one per CPU). The session WPM
+    is drawn once and shared; each piece starts with the last character of the
+    previous one as `last_char_typed` and with the fatigue expected after the
+    preceding text (FATIGUE_FACTOR per expected keystroke, see expected_keystrokes).
+    The per-piece plans are then shifted by the actual end time of the pieces before
+    them and stitched into one PLAN_DTYPE plan.
+
+    The split only depends on `chunk_chars`, so seeded results do not depend on the
+    worker count.
+    """
+    if not workers:
+        workers = os.cpu_count() or 1
+
+    pieces = split_text(target_text, chunk_chars)
+    session_seed, *piece_seeds = np.random.SeedSequence(seed).spawn(len(pieces) + 1)
+    session_wpm = max(10, np.random.default_rng(session_seed).normal(wpm, WPM_STD))
+
+    keystrokes = expected_keystrokes(target_text, layout)
+    args = []
+    start = 0
+    keys_before = 0.0
+    for piece, piece_seed in zip(pieces, piece_seeds):
+        fatigue = FATIGUE_FACTOR ** keys_before
+        last_char = target_text[start - 1] if start else None
+        args.append((piece, wpm, layout, piece_seed, session_wpm, fatigue, last_char))
+        keys_before += sum(keystrokes[start:start + len(piece)])
+        start += len(piece)
+
+    if workers == 1 or len(pieces) == 1:
+        results = [_simulate_text_chunk(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pieces))) as pool:
+            results = list(pool.map(_simulate_text_chunk, *zip(*args)))
+
+    # Stitch: drop the INIT record of every piece but the first and shift its times
+    offset = 0.0
+    parts = []
+    for i, (total_time, plan) in enumerate(results):
+        if i:
+            plan = plan[1:]
+        plan["time"] += offset
+        parts.append(plan)
+        offset += total_time
+    return offset, np.concatenate(parts)
+
+def demo_single_run(target_text, wpm, seed=None, fps=DEMO_FPS):
     """
     Displays a detailed real-time simulation.
+
+    The session is simulated first, then replayed at its simulated timing by a
+    TerminalRenderer, which draws each event's delta and refreshes the
+    terminal at most `fps` times per second.
     """
     has_newlines = True if target_text.count("\n") > 0 else False
     if has_newlines:
@@ -45,60 +232,20 @@ def demo_single_run(target_text, wpm):
     print("Preparing simulation...\n")
     
     # 1. Calculate trajectory instantly
-    typer = MarkovTyper(target_text, target_wpm=wpm)
+    typer = MarkovTyper(target_text, target_wpm=wpm, seed=seed)
     total_time, history = typer.run()
     
     # 2. Replay history
     print("START TYPING:")
     print("-" * 40)
+    sys.stdout.flush()
     
-    last_time = 0.0
-    current_output = ""
-    
-    for t, action, text in history:
-        # Calculate delay
-        delay = t - last_time
-        if delay > 0:
-            time.sleep(delay)
-        last_time = t
-        
-        # Differential update logic
-        if text.startswith(current_output):
-            # We added characters (Normal typing or swap)
-            new_part = text[len(current_output):]
-            sys.stdout.write(new_part)
-        elif current_output.startswith(text):
-            # We removed characters (Backspacing)
-            removed_part = current_output[len(text):]
-            for char in reversed(removed_part):
-                if char == '\n':
-                    # Move cursor up one line
-                    sys.stdout.write('\033[A')
-                    # Find the length of the line we are moving up to
-                    lines = text.split('\n')
-                    last_line_len = len(lines[-1]) if lines else 0
-                    # Move cursor to the end of that line
-                    # \033[G moves to absolute column. Using a large number or exact len
-                    sys.stdout.write(f'\033[{last_line_len + 1}G')
-                else:
-                    # Generic backspace/clear
-                    sys.stdout.write('\b \b')
-        else:
-            # Divergence (e.g. middle-string correction if implemented in future)
-            # Fallback: Clear block and redraw (rare)
-            prev_lines = current_output.count('\n')
-            if prev_lines > 0:
-                sys.stdout.write(f'\033[{prev_lines}A')
-            sys.stdout.write('\r\033[J')
-            sys.stdout.write(text)
-            
-        sys.stdout.flush()
-        current_output = text
+    play(history, TerminalRenderer(sys.stdout), fps=fps)
         
     print("\n" + "-" * 40)
     print(f"Total Simulated Time: {total_time:.4f}s")
     
     # Show errors
-    errors = [h for h in history if "ERROR" in h[1]]
+    errors = history.count(EventKind.TYPED_ERROR)
     if errors:
-        print(f"Errors made and corrected: {len(errors)}")
+        print(f"Errors made and corrected: {errors}")
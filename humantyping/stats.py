@@ -0,0 +1,191 @@
+import math
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .instrumentation import TyperMetrics
+
+
+# Quantiles reported by default (p50 / p90 / p99 / p99.9)
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+# Default histogram: 10 log-spaced bins per decade from 10 ms to 100 000 s
+DEFAULT_HIST_EDGES = np.geomspace(1e-2, 1e5, 71)
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch with bounded relative error.
+
+    Values are counted in logarithmic buckets (DDSketch-style): every value in a
+    bucket is within `relative_accuracy` of the bucket's representative value.
+    The bucket array starts out covering [min_value, max_value] and grows when
+    larger values arrive, so the sketch is unbounded at the top while its size
+    stays logarithmic in the largest value, not in how many values are added.
+    Values below min_value (sub-0.1 ms durations) go into the first bucket.
+    """
+
+    __slots__ = ("relative_accuracy", "min_value", "_log_gamma", "_offset", "counts")
+
+    def __init__(self, relative_accuracy=0.005, min_value=1e-4, max_value=1e6):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(gamma)
+        self._offset = math.floor(math.log(min_value) / self._log_gamma)
+        n_buckets = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+        self.counts = np.zeros(n_buckets, dtype=np.int64)
+
+    def _same_layout(self, other):
+        return (self.relative_accuracy, self.min_value) == (other.relative_accuracy, other.min_value)
+
+    def _grow(self, n_buckets):
+        if n_buckets > len(self.counts):
+            counts = np.zeros(n_buckets, dtype=np.int64)
+            counts[:len(self.counts)] = self.counts
+            self.counts = counts
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return
+        values = np.maximum(values, self.min_value)
+        idx = np.ceil(np.log(values) / self._log_gamma).astype(np.int64) - self._offset
+        counts = np.bincount(idx)
+        self._grow(len(counts))
+        self.counts[:len(counts)] += counts
+
+    def merge(self, other):
+        if not self._same_layout(other):
+            raise ValueError("Cannot merge sketches with different parameters")
+        self._grow(len(other.counts))
+        self.counts[:len(other.counts)] += other.counts
+
+    def quantile(self, q):
+        """Returns the estimated q-quantile (0 <= q <= 1), or nan if empty."""
+        total = self.count
+        if total == 0:
+            return float("nan")
+        rank = q * (total - 1)
+        i = int(np.searchsorted(np.cumsum(self.counts), rank, side="right"))
+        gamma = math.exp(self._log_gamma)
+        return 2 * gamma ** (i + self._offset) / (gamma + 1)
+
+
+@dataclass
+class MonteCarloResult:
+    """Summary of a Monte Carlo run, produced by StreamingStats.result()."""
+    n: int
+    mean: float
+    std: float
+    min: float
+    max: float
+    quantiles: Dict[float, float] = field(default_factory=dict)
+    hist_edges: np.ndarray = None
+    hist_counts: np.ndarray = None
+    underflow: int = 0
+    overflow: int = 0
+    computation_time: float = 0.0
+    # Aggregated simulator counters, set by run_monte_carlo(instrument=True)
+    metrics: "TyperMetrics" = None
+
+    @property
+    def p50(self):
+        return self.quantiles.get(0.5)
+
+    @property
+    def p90(self):
+        return self.quantiles.get(0.9)
+
+    @property
+    def p99(self):
+        return self.quantiles.get(0.99)
+
+    @property
+    def p999(self):
+        return self.quantiles.get(0.999)
+
+
+class StreamingStats:
+    """
+    Constant-memory aggregator for simulated times.
+
+    Tracks count, mean and variance (Welford, combined per batch with Chan's
+    parallel update), min/max, a QuantileSketch and a fixed-bin histogram.
+    Aggregators built with the same parameters can be merged, so each worker
+    can reduce its own chunk and only the summaries travel back.
+    """
+
+    def __init__(self, hist_edges=None, relative_accuracy=0.005):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.hist_edges = np.asarray(DEFAULT_HIST_EDGES if hist_edges is None else hist_edges, dtype=float)
+        self.hist_counts = np.zeros(len(self.hist_edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def _combine(self, n, mean, m2):
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    def update(self, values):
+        """Adds a batch of values."""
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return
+        batch_mean = float(values.mean())
+        self._combine(len(values), batch_mean, float(((values - batch_mean) ** 2).sum()))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sketch.update(values)
+        counts, _ = np.histogram(values, self.hist_edges)
+        self.hist_counts += counts
+        self.underflow += int((values < self.hist_edges[0]).sum())
+        self.overflow += int((values > self.hist_edges[-1]).sum())
+
+    def merge(self, other):
+        """Folds another aggregator (same histogram edges and sketch accuracy) into this one."""
+        if not np.array_equal(self.hist_edges, other.hist_edges):
+            raise ValueError("Cannot merge stats with different histogram edges")
+        if other.n == 0:
+            return
+        self._combine(other.n, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        self.hist_counts += other.hist_counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    @property
+    def variance(self):
+        return self.m2 / self.n if self.n else float("nan")
+
+    def result(self, quantiles=DEFAULT_QUANTILES, computation_time=0.0):
+        empty = self.n == 0
+        return MonteCarloResult(
+            n=self.n,
+            mean=float("nan") if empty else self.mean,
+            std=math.sqrt(self.variance) if not empty else float("nan"),
+            min=float("nan") if empty else self.min,
+            max=float("nan") if empty else self.max,
+            quantiles={q: min(max(self.sketch.quantile(q), self.min), self.max) if not empty else float("nan")
+                       for q in quantiles},
+            hist_edges=self.hist_edges.copy(),
+            hist_counts=self.hist_counts.copy(),
+            underflow=self.underflow,
+            overflow=self.overflow,
+            computation_time=computation_time,
+        )
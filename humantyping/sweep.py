@@ -0,0 +1,136 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from .plan import text_hash
+from .simulation import run_monte_carlo
+
+# Grid axes and how their values are parsed
+GRID_AXES = {"wpm": float, "layout": str, "n": int}
+RESULT_COLUMNS = ("text", "chars", "wpm", "layout", "n", "engine", "seed",
+                  "mean", "std", "min", "max", "p50", "p90", "p99", "p999", "computation_time", "cached")
+
+
+def parse_grid(spec, defaults=None):
+    """
+    Parses a grid specification such as ["wpm=40,60,80", "layout=qwerty,azerty"]
+    into {axis: [values]}. Axes missing from the spec take their value from `defaults`.
+    """
+    grid = {axis: list(values) for axis, values in (defaults or {}).items()}
+    for item in spec:
+        axis, sep, values = item.partition("=")
+        axis = axis.strip()
+        if not sep or axis not in GRID_AXES:
+            raise ValueError(f"Invalid grid entry {item!r}: expected one of {', '.join(GRID_AXES)} as axis=v1,v2,...")
+        try:
+            grid[axis] = [GRID_AXES[axis](v.strip()) for v in values.split(",") if v.strip()]
+        except ValueError:
+            raise ValueError(f"Invalid value in grid entry {item!r}") from None
+        if not grid[axis]:
+            raise ValueError(f"Grid axis {axis!r} has no values")
+    return grid
+
+
+def load_texts(directory):
+    """Returns [(name, text)] for every *.txt file of `directory`, sorted by name."""
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".txt"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                texts.append((name, f.read()))
+    if not texts:
+        raise ValueError(f"No .txt files in {directory}")
+    return texts
+
+
+def _cell_key(text, wpm, layout, n, seed, engine):
+    from . import __version__
+    return {"version": __version__, "text_sha256": text_hash(text), "wpm": wpm,
+            "layout": layout, "n": n, "seed": seed, "engine": engine}
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, text_hash(json.dumps(key, sort_keys=True)) + ".json")
+
+
+def _run_cell(text, wpm, layout, n, seed, engine):
+    result = run_monte_carlo(text, wpm, n_simulations=n, seed=seed, engine=engine, layout=layout, verbose=False)
+    return {"mean": result.mean, "std": result.std, "min": result.min, "max": result.max,
+            "p50": result.p50, "p90": result.p90, "p99": result.p99, "p999": result.p999,
+            "computation_time": result.computation_time}
+
+
+def run_sweep(texts, grid, seed=None, engine="vectorized", workers=1, cache_dir=".sweep_cache",
+              output="sweep_results.csv", verbose=True):
+    """
+    Runs one Monte Carlo per cell of texts x grid["wpm"] x grid["layout"] x grid["n"].
+
+    Cells are scheduled over a process pool (workers=None/0 for one per CPU). Each
+    finished cell is stored in `cache_dir` under a hash of its parameters, the text
+    and the library version, so an interrupted sweep picks up where it stopped and
+    changed texts or a new version are recomputed. Every cell uses the same `seed`
+    (common random numbers), which keeps differences between cells free of sampling
+    noise from distinct streams.
+
+    All rows are written to `output` as CSV (tab-separated for .tsv) in grid order,
+    and returned as a list of dicts.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    cells = [(name, text, wpm, layout, n)
+             for (name, text), wpm, layout, n in product(texts, grid["wpm"], grid["layout"], grid["n"])]
+    rows = [None] * len(cells)
+    pending = {}
+    done = 0
+
+    def report(i, cached):
+        if verbose:
+            row = rows[i]
+            status = " (cached)" if cached else ""
+            print(f"[{done}/{len(cells)}] {row['text']} wpm={row['wpm']:g} layout={row['layout']} n={row['n']}: "
+                  f"mean {row['mean']:.2f}s, p90 {row['p90']:.2f}s{status}")
+
+    for i, (name, text, wpm, layout, n) in enumerate(cells):
+        path = _cache_path(cache_dir, _cell_key(text, wpm, layout, n, seed, engine))
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                stats = json.load(f)
+            rows[i] = dict(text=name, chars=len(text), wpm=wpm, layout=layout, n=n, engine=engine,
+                           seed=seed, cached=True, **stats)
+            done += 1
+            report(i, True)
+        else:
+            pending[i] = path
+
+    def store(i, stats):
+        name, text, wpm, layout, n = cells[i]
+        tmp = pending[i] + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(stats, f)
+        os.replace(tmp, pending[i])
+        rows[i] = dict(text=name, chars=len(text), wpm=wpm, layout=layout, n=n, engine=engine,
+                       seed=seed, cached=False, **stats)
+
+    if workers == 1:
+        for i in pending:
+            name, text, wpm, layout, n = cells[i]
+            store(i, _run_cell(text, wpm, layout, n, seed, engine))
+            done += 1
+            report(i, False)
+    elif pending:
+        with ProcessPoolExecutor(max_workers=workers or None) as pool:
+            futures = {pool.submit(_run_cell, *cells[i][1:], seed, engine): i for i in pending}
+            for future in as_completed(futures):
+                i = futures[future]
+                store(i, future.result())
+                done += 1
+                report(i, False)
+
+    delimiter = "\t" if output.endswith(".tsv") else ","
+    with open(output, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS, delimiter=delimiter)
+        writer.writeheader()
+        writer.writerows(rows)
+    if verbose:
+        print(f"Wrote {len(rows)} rows to {output} ({len(rows) - len(pending)} from cache)")
+    return rows
@@ -1,67 +1,170 @@
-import numpy as np
+from array import array
 from dataclasses import dataclass, field
 from typing import List
 from .config import *
-from .keyboard import KeyboardLayout
-from .language import get_word_difficulty, is_common_bigram
+from .events import EventKind, TYPING_KINDS
+from .keyboard import get_layout
+from .language import build_word_index
+from .rng import BlockRNG
 
-@dataclass
+# Characters at which a pending error is always corrected
+WORD_SEPARATORS = ' \n\t.,;!?:()[]{}<>"\''
+
+
+class TypingHistory:
+    """
+    Compact keystroke log: one timestamp, one EventKind and one key per event
+    (the typed character, "" for backspaces and arrows).
+
+    Iterating yields (time, kind, key) records. Full-text snapshots are not
+    stored; they are rebuilt on demand (see `snapshots`). `to_array` packs the
+    log into a numpy structured array (see plan.PLAN_DTYPE).
+    """
+
+    __slots__ = ("times", "kinds", "keys", "session_wpm")
+
+    def __init__(self, session_wpm=0.0):
+        self.times = array("d")
+        self.kinds = array("b")
+        self.keys = []
+        self.session_wpm = session_wpm
+
+    def append(self, t, kind, key=""):
+        self.times.append(t)
+        self.kinds.append(kind)
+        self.keys.append(key)
+
+    def count(self, kind):
+        return self.kinds.count(kind)
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, i):
+        return self.times[i], EventKind(self.kinds[i]), self.keys[i]
+
+    def __iter__(self):
+        for i in range(len(self.times)):
+            yield self.times[i], EventKind(self.kinds[i]), self.keys[i]
+
+    def snapshots(self):
+        """Yields (time, kind, key, text_on_screen) tuples by replaying the log."""
+        buffer = []
+        for t, kind, key in self:
+            if kind == EventKind.BACKSPACE:
+                if buffer:
+                    buffer.pop()
+            elif kind in TYPING_KINDS:
+                buffer.append(key)
+            yield t, kind, key, "".join(buffer)
+
+    def to_array(self):
+        """Returns the log as a structured array with fields time, kind and key."""
+        from .plan import history_to_array
+        return history_to_array(self)
+
+
+@dataclass(slots=True)
 class TypingState:
-    current_text: str = ""
     target_text: str = ""
     total_time: float = 0.0
-    history: List[tuple] = field(default_factory=list)
+    history: TypingHistory = field(default_factory=TypingHistory)
     last_char_typed: str = None 
     fatigue_multiplier: float = 1.0
     mental_cursor_pos: int = 0 
+    # Typed buffer, kept mutable so appends and backspaces are O(1)
+    typed: List[str] = field(default_factory=list)
+    # Length of the prefix of `typed` that matches `target_text` (divergence point)
+    correct_prefix: int = 0
+    last_was_backspace: bool = False
+
+    @property
+    def current_text(self):
+        return "".join(self.typed)
+
+    def push_char(self, char):
+        pos = len(self.typed)
+        self.typed.append(char)
+        if self.correct_prefix == pos and pos < len(self.target_text) and self.target_text[pos] == char:
+            self.correct_prefix += 1
+        self.last_was_backspace = False
+
+    def pop_char(self):
+        self.typed.pop()
+        if self.correct_prefix > len(self.typed):
+            self.correct_prefix = len(self.typed)
+        self.last_was_backspace = True
 
 class MarkovTyper:
-    def __init__(self, target_text, target_wpm=DEFAULT_WPM, layout="qwerty"):
+    def __init__(self, target_text, target_wpm=DEFAULT_WPM, layout="qwerty", seed=None, metrics=None, sinks=None):
         self.target_text = target_text
-        self.keyboard = KeyboardLayout(layout)
+        self.target_wpm = target_wpm
+        self.layout = layout
+        self.seed = seed
+        # Per-typer random stream; pass a seed for reproducible plans
+        self.rng = BlockRNG(seed)
+        self.keyboard = get_layout(layout)
         self.state = TypingState(target_text=target_text)
+        # Per-position word span and difficulty, so the hot loop never rescans the text
+        self.word_starts, self.word_ends, self.word_difficulty = build_word_index(target_text)
         
-        self.session_wpm = np.random.normal(target_wpm, WPM_STD)
+        self.session_wpm = self.rng.normal(target_wpm, WPM_STD)
         self.session_wpm = max(10, self.session_wpm)
         self.base_keystroke_time = 60 / (self.session_wpm * AVG_WORD_LENGTH)
         
-        self.state.history.append((0.0, f"INIT (WPM: {self.session_wpm:.1f})", ""))
+        # Set to False to stream events without keeping them (see iter_events)
+        self.record_history = True
+        self.state.history.session_wpm = self.session_wpm
+        self.state.history.append(0.0, EventKind.INIT)
+
+        # Optional instrumentation, off by default (see instrumentation.instrument).
+        # metrics=True collects into self.metrics; a TyperMetrics also accumulates runs;
+        # sinks are callables that receive each run's metrics. None/False leave it off.
+        self.metrics = None
+        if metrics or sinks:
+            from .instrumentation import instrument
+            instrument(self, None if isinstance(metrics, bool) else metrics, sinks)
+
+    def carry_over(self, session_wpm=None, fatigue_multiplier=1.0, last_char_typed=None):
+        """
+        Starts this typer where a previous piece of the same session left off,
+        for texts simulated in chunks (see simulation.simulate_chunked).
+        Call before the first step.
+        """
+        if session_wpm is not None:
+            self.session_wpm = session_wpm
+            self.base_keystroke_time = 60 / (session_wpm * AVG_WORD_LENGTH)
+            self.state.history.session_wpm = session_wpm
+        self.state.fatigue_multiplier = fatigue_multiplier
+        self.state.last_char_typed = last_char_typed
 
     def _get_current_word_context(self):
         idx = self.state.mental_cursor_pos
         if idx >= len(self.target_text):
             return None
-        start = idx
-        while start > 0 and self.target_text[start-1] != ' ':
-            start -= 1
-        end = idx
-        while end < len(self.target_text) and self.target_text[end] != ' ':
-            end += 1
-        return self.target_text[start:end]
+        return self.target_text[self.word_starts[idx]:self.word_ends[idx]]
+
+    def _get_current_word_difficulty(self):
+        idx = self.state.mental_cursor_pos
+        if idx >= len(self.target_text):
+            return None
+        return self.word_difficulty[idx]
 
     def _calculate_keystroke_time(self, char_to_type):
         time = self.base_keystroke_time * self.state.fatigue_multiplier
         
-        current_word = self._get_current_word_context()
-        if current_word:
-            difficulty = get_word_difficulty(current_word)
-            if difficulty == "common":
-                time *= SPEED_BOOST_COMMON_WORD
-            elif difficulty == "complex":
-                time *= SPEED_PENALTY_COMPLEX_WORD
+        difficulty = self._get_current_word_difficulty()
+        if difficulty == "common":
+            time *= SPEED_BOOST_COMMON_WORD
+        elif difficulty == "complex":
+            time *= SPEED_PENALTY_COMPLEX_WORD
         
         if self.state.last_char_typed:
-            if is_common_bigram(self.state.last_char_typed, char_to_type):
-                time *= SPEED_BOOST_BIGRAM 
-            else:
-                dist = self.keyboard.get_distance(self.state.last_char_typed, char_to_type)
-                if dist < 2.0 and dist > 0:
-                    time *= SPEED_BOOST_CLOSE_KEYS
-                elif dist > 4.0:
-                    time *= 1.2
+            # Bigram burst / key distance, precompiled per layout
+            time *= self.keyboard.transition_cost(self.state.last_char_typed, char_to_type)
 
         if char_to_type == ' ':
-            time += np.random.normal(TIME_SPACE_PAUSE_MEAN, TIME_SPACE_PAUSE_STD)
+            time += self.rng.normal(TIME_SPACE_PAUSE_MEAN, TIME_SPACE_PAUSE_STD)
         elif self.keyboard.is_composed_accent(char_to_type):
             time += TIME_COMPOSED_ACCENT_PENALTY
         elif self.keyboard.is_direct_accent(char_to_type):
@@ -69,117 +172,127 @@ class MarkovTyper:
         elif char_to_type.isupper():
             time += TIME_UPPERCASE_PENALTY
                 
-        dt = np.random.normal(time, TIME_KEYSTROKE_STD)
+        dt = self.rng.normal(time, TIME_KEYSTROKE_STD)
         return max(0.02, dt)
 
     def step(self):
+        state = self.state
+        target_len = len(self.target_text)
+        typed_len = len(state.typed)
+
         # 1. Check for completion
-        if self.state.current_text == self.target_text:
+        if state.correct_prefix == target_len and typed_len == target_len:
             return None
 
-        # --- MONITORING & CORRECTION PHASE ---
-        
-        # Calculate divergence point
-        first_error_pos = len(self.target_text)
-        min_len = min(len(self.state.current_text), len(self.target_text))
-        for i in range(min_len):
-            if self.state.current_text[i] != self.target_text[i]:
-                first_error_pos = i
-                break
+        # Divergence point is tracked incrementally by push_char/pop_char.
+        # Over-typing past the end of the target counts as an error too.
+        # Do we have an error?
+        if state.correct_prefix < typed_len:
+            step = self._monitor_and_correct()
+            if step is not None:
+                return step
+
+        return self._type_next()
+
+    def _monitor_and_correct(self):
+        """Monitoring & correction phase: returns a backspace event, or None to keep typing."""
+        state = self.state
+        target_len = len(self.target_text)
+        typed_len = len(state.typed)
+        first_error_pos = state.correct_prefix
+
+        should_correct = False
         
-        # Also consider over-typing as an error
-        if len(self.state.current_text) > len(self.target_text) and first_error_pos == len(self.target_text):
-            first_error_pos = len(self.target_text)
+        # Case 0: CONTINUED BACKSPACING (Critical)
+        if state.last_was_backspace:
+            should_correct = True # Lock into backspacing until fixed
 
-        # Do we have an error?
-        if first_error_pos < len(self.state.current_text):
-            should_correct = False
+        # Case A: End of text (Always correct)
+        elif state.mental_cursor_pos >= target_len:
+            should_correct = True
             
-            last_action = self.state.history[-1][1] if self.state.history else ""
+        # Case B: End of Word / Context Check
+        elif typed_len > 0:
+            last_char = state.typed[-1]
+            distance = typed_len - first_error_pos
             
-            # Case 0: CONTINUED BACKSPACING (Critical)
-            if "BACKSPACE" in last_action:
-                should_correct = True # Lock into backspacing until fixed
-
-            # Case A: End of text (Always correct)
-            elif self.state.mental_cursor_pos >= len(self.target_text):
+            # Check at word boundaries (Strict)
+            # Correction is mandatory at any separator to prevent error accumulation
+            if last_char in WORD_SEPARATORS:
                 should_correct = True
-                
-            # Case B: End of Word / Context Check
-            elif len(self.state.current_text) > 0:
-                last_char = self.state.current_text[-1]
-                distance = len(self.state.current_text) - first_error_pos
-                
-                # Check at word boundaries (Strict)
-                # Correction is mandatory at any separator to prevent error accumulation
-                if last_char in ' \n\t.,;!?:()[]{}<>"\'':
+            
+            # Drift Check (Don't let errors linger)
+            elif distance >= 2:
+                # High probability to notice error as we type further away
+                rand_value = self.rng.random()
+                if rand_value < 0.8:
                     should_correct = True
                 
-                # Drift Check (Don't let errors linger)
-                elif distance >= 2:
-                    # High probability to notice error as we type further away
-                    rand_value = np.random.random()
-                    if rand_value < 0.8:
-                        should_correct = True
-                    
-                # Immediate reaction (1 char past error)
-                elif distance == 1:
-                    rand_value = np.random.random()
-                    if rand_value < PROB_NOTICE_ERROR:
-                        should_correct = True
-
-            if should_correct:
-                # Reaction time check (only if we weren't already backspacing)
-                if "BACKSPACE" not in last_action:
-                     dt = np.random.normal(TIME_REACTION_MEAN, TIME_REACTION_STD)
-                     self.state.total_time += max(0.1, dt)
-                
-                # Perform Backspace
-                dt = np.random.normal(TIME_BACKSPACE_MEAN, TIME_BACKSPACE_STD)
-                self.state.total_time += dt
-                self.state.current_text = self.state.current_text[:-1]
-                
-                step = (self.state.total_time, "BACKSPACE", self.state.current_text)
-                self.state.history.append(step)
-                
-                # Sync mental cursor immediately
-                self.state.mental_cursor_pos = len(self.state.current_text)
-                return step
+            # Immediate reaction (1 char past error)
+            elif distance == 1:
+                rand_value = self.rng.random()
+                if rand_value < PROB_NOTICE_ERROR:
+                    should_correct = True
 
-        # --- TYPING PHASE ---
+        if should_correct:
+            # Reaction time check (only if we weren't already backspacing)
+            if not state.last_was_backspace:
+                 dt = self.rng.normal(TIME_REACTION_MEAN, TIME_REACTION_STD)
+                 state.total_time += max(0.1, dt)
+            
+            # Perform Backspace
+            dt = self.rng.normal(TIME_BACKSPACE_MEAN, TIME_BACKSPACE_STD)
+            state.total_time += dt
+            state.pop_char()
+            
+            step = (state.total_time, EventKind.BACKSPACE, "")
+            if self.record_history:
+                state.history.append(*step)
+            
+            # Sync mental cursor immediately
+            state.mental_cursor_pos = len(state.typed)
+            return step
+        return None
+
+    def _type_next(self):
+        """Typing phase: types the next intended (or mistaken) character."""
+        state = self.state
+        target_len = len(self.target_text)
+        typed_len = len(state.typed)
 
         # Sync mental cursor if we backspaced (redundant safety)
-        if self.state.mental_cursor_pos > len(self.state.current_text):
-             self.state.mental_cursor_pos = len(self.state.current_text)
+        if state.mental_cursor_pos > typed_len:
+             state.mental_cursor_pos = typed_len
         
         # If we are done typing but text is correct (caught by top check), or waiting for consistency
-        if self.state.mental_cursor_pos >= len(self.target_text):
+        if state.mental_cursor_pos >= target_len:
              # This happens if we just corrected an 'overtype' error and now we are 'at the end'
              # The next loop will catch completion.
              return None
 
-        char_intended = self.target_text[self.state.mental_cursor_pos]
-        self.state.fatigue_multiplier *= FATIGUE_FACTOR
+        char_intended = self.target_text[state.mental_cursor_pos]
+        state.fatigue_multiplier *= FATIGUE_FACTOR
 
         # Swap Error (Anticipation)
         # Using the next char after the supposed typed char
         # Example: "the" -> "hte". Typing 'h' instead of 't'.
-        if len(self.target_text) > self.state.mental_cursor_pos + 1:
-            char_after = self.target_text[self.state.mental_cursor_pos + 1]
+        if target_len > state.mental_cursor_pos + 1:
+            char_after = self.target_text[state.mental_cursor_pos + 1]
             if char_after != ' ' and char_after != char_intended:
-                if np.random.random() < PROB_SWAP_ERROR:
+                if self.rng.random() < PROB_SWAP_ERROR:
                     dt = self._calculate_keystroke_time(char_after)
-                    self.state.total_time += dt
-                    self.state.current_text += char_after
-                    self.state.last_char_typed = char_after
-                    step = (self.state.total_time, f"TYPED_SWAP '{char_after}'", self.state.current_text)
-                    self.state.history.append(step)
-                    self.state.mental_cursor_pos += 1
+                    state.total_time += dt
+                    state.push_char(char_after)
+                    state.last_char_typed = char_after
+                    step = (state.total_time, EventKind.TYPED_SWAP, char_after)
+                    if self.record_history:
+                        state.history.append(*step)
+                    state.mental_cursor_pos += 1
                     return step
 
         # Normal Typing (Success or Error)
         current_prob_error = PROB_ERROR
-        word_diff = get_word_difficulty(self._get_current_word_context() or "")
+        word_diff = self._get_current_word_difficulty()
         if word_diff == "complex": 
             current_prob_error *= 1.5
         elif word_diff == "common": 
@@ -187,33 +300,67 @@ class MarkovTyper:
         if self.keyboard.is_composed_accent(char_intended): 
             current_prob_error *= 2.0
 
-        if np.random.random() < current_prob_error:
+        if self.rng.random() < current_prob_error:
             # Generate Error
-            wrong_char = self.keyboard.get_random_neighbor(char_intended)
+            wrong_char = self.keyboard.get_random_neighbor(char_intended, self.rng)
             dt = self._calculate_keystroke_time(wrong_char)
-            self.state.total_time += dt
-            self.state.current_text += wrong_char
-            self.state.last_char_typed = wrong_char
-            step = (self.state.total_time, f"TYPED_ERROR '{wrong_char}'", self.state.current_text)
-            self.state.history.append(step)
-            self.state.mental_cursor_pos += 1
+            state.total_time += dt
+            state.push_char(wrong_char)
+            state.last_char_typed = wrong_char
+            step = (state.total_time, EventKind.TYPED_ERROR, wrong_char)
+            if self.record_history:
+                state.history.append(*step)
+            state.mental_cursor_pos += 1
         else:
             # Success
             dt = self._calculate_keystroke_time(char_intended)
-            self.state.total_time += dt
-            self.state.current_text += char_intended
-            self.state.last_char_typed = char_intended
-            step = (self.state.total_time, f"TYPED '{char_intended}'", self.state.current_text)
-            self.state.history.append(step)
-            self.state.mental_cursor_pos += 1
+            state.total_time += dt
+            state.push_char(char_intended)
+            state.last_char_typed = char_intended
+            step = (state.total_time, EventKind.TYPED, char_intended)
+            if self.record_history:
+                state.history.append(*step)
+            state.mental_cursor_pos += 1
             
         return step
 
-    def run(self):
+    def iter_events(self, record_history=False):
+        """
+        Simulates the session lazily, yielding (time, event_kind, key) tuples as
+        they are produced. `time` is the absolute simulated time in seconds and
+        `key` is the typed character ("" for backspace).
+
+        The first event is available after a single step, and unless
+        `record_history` is True nothing is kept, so memory does not grow with
+        the text length.
+        """
+        self.record_history = record_history
         steps = 0
         max_steps = len(self.target_text) * 10
-        while self.step() is not None:
-            steps += 1
-            if steps > max_steps:
+        while steps <= max_steps:
+            event = self.step()
+            if event is None:
                 break
-        return self.state.total_time, self.state.history
\ No newline at end of file
+            yield event
+            steps += 1
+        if self.metrics is not None:
+            from .instrumentation import finish_run
+            finish_run(self)
+
+    def run(self):
+        for _ in self.iter_events(record_history=True):
+            pass
+        return self.state.total_time, self.state.history
+
+    def export_plan(self, path):
+        """
+        Writes the plan to a binary .npz file (see plan.save_plan) that
+        `HumanTyper.replay` can play without running the simulator, and
+        returns its path. Runs the simulation first if it has not been run yet.
+        """
+        from .plan import save_plan
+        history = self.state.history
+        if len(history) <= 1:
+            self.run()
+        return save_plan(path, history.to_array(), self.target_text,
+                  layout=self.layout, wpm=self.target_wpm, seed=self.seed)
@@ -0,0 +1,237 @@
+import time
+import numpy as np
+from .config import *
+from .keyboard import get_layout
+from .language import build_word_index
+from .typer import WORD_SEPARATORS
+
+
+class VectorizedTyper:
+    """
+    Runs many independent MarkovTyper trajectories in lockstep as numpy arrays.
+
+    Every trial follows the same state machine as `MarkovTyper.step` (same
+    probabilities, timings and correction rules), but all trials advance one
+    step per iteration: per-trial cursor, divergence position, fatigue, time and
+    error state live in arrays, and masks select the trials that are
+    backspacing, typing or finished. Only total times are produced; there is no
+    per-trial history.
+
+    Draws do not follow the same stream as the scalar typer, so individual
+    trajectories differ, but the timing distribution is the same.
+    """
+
+    def __init__(self, target_text, target_wpm=DEFAULT_WPM, layout="qwerty", seed=None):
+        self.target_text = target_text
+        self.target_wpm = target_wpm
+        self.keyboard = get_layout(layout)
+        self.rng = np.random.default_rng(seed)
+        self._compile()
+
+    def _compile(self):
+        """Encodes the text and builds the per-character and per-position lookup tables."""
+        text = self.target_text
+        kb = self.keyboard
+        flat_grid = kb.flat_grid
+
+        alphabet = sorted(set(text) | set(flat_grid))
+        codes = {c: i for i, c in enumerate(alphabet)}
+        n_chars = len(alphabet)
+        self.alphabet = alphabet
+        # Code n_chars stands for "nothing typed yet" / "past the end of the text"
+        self.none_code = n_chars
+        self.code_dtype = np.min_scalar_type(n_chars)
+
+        # Target text as codes, padded with the sentinel for lookahead
+        self.text_codes = np.array([codes[c] for c in text] + [n_chars, n_chars], dtype=np.int64)
+
+        # Per-character properties
+        self.is_space = np.zeros(n_chars + 1, dtype=bool)
+        self.is_separator = np.zeros(n_chars + 1, dtype=bool)
+        self.add_penalty = np.zeros(n_chars + 1)
+        for c, i in codes.items():
+            self.is_space[i] = c == ' '
+            self.is_separator[i] = c in WORD_SEPARATORS
+            if c == ' ':
+                continue
+            elif kb.is_composed_accent(c):
+                self.add_penalty[i] = TIME_COMPOSED_ACCENT_PENALTY
+            elif kb.is_direct_accent(c):
+                self.add_penalty[i] = TIME_DIRECT_ACCENT_PENALTY
+            elif c.isupper():
+                self.add_penalty[i] = TIME_UPPERCASE_PENALTY
+
+        # Transition multiplier from the previous char (row) to the next one (column),
+        # gathered from the layout's compiled table
+        layout_codes = [kb.char_codes.get(c) for c in alphabet]
+        known = np.array([i for i, code in enumerate(layout_codes) if code is not None], dtype=np.int64)
+        known_codes = np.array([code for code in layout_codes if code is not None], dtype=np.int64)
+        self.transition = np.ones((n_chars + 1, n_chars + 1))
+        self.transition[np.ix_(known, known)] = kb.transition_costs[np.ix_(known_codes, known_codes)]
+        for i, code in enumerate(layout_codes):
+            if code is None:
+                for j, c in enumerate(alphabet):
+                    self.transition[i, j] = kb.transition_multiplier(alphabet[i], c)
+                    self.transition[j, i] = kb.transition_multiplier(c, alphabet[i])
+
+        # Neighbor tables (padded) for error generation
+        neighbors = {}
+        for c in set(text):
+            neighbors[codes[c]] = [codes[n] for n in (kb.get_neighbor_keys(c) or flat_grid)]
+        width = max((len(v) for v in neighbors.values()), default=1)
+        self.neighbor_table = np.zeros((n_chars + 1, width), dtype=np.int64)
+        self.neighbor_count = np.ones(n_chars + 1, dtype=np.int64)
+        for i, v in neighbors.items():
+            self.neighbor_table[i, :len(v)] = v
+            self.neighbor_count[i] = len(v)
+
+        # Per-position word difficulty factors (one extra slot for the end of text)
+        _, _, difficulties = build_word_index(text)
+        self.time_factor = np.ones(len(text) + 1)
+        self.error_prob = np.full(len(text) + 1, PROB_ERROR)
+        for p, difficulty in enumerate(difficulties):
+            if difficulty == "common":
+                self.time_factor[p] = SPEED_BOOST_COMMON_WORD
+                self.error_prob[p] *= 0.5
+            elif difficulty == "complex":
+                self.time_factor[p] = SPEED_PENALTY_COMPLEX_WORD
+                self.error_prob[p] *= 1.5
+            if kb.is_composed_accent(text[p]):
+                self.error_prob[p] *= 2.0
+
+    def run(self, n_trials, metrics=None):
+        """
+        Simulates `n_trials` independent sessions and returns their total times
+        as a float array, in the same units as `MarkovTyper.run`.
+
+        If `metrics` (a TyperMetrics) is given, the run's counters and phase
+        timings are added to it. The lockstep engine draws every variate for
+        every active trial; counters report the draws and lookups each trial's
+        path uses, as MarkovTyper counts them (see TyperMetrics).
+        """
+        rng = self.rng
+        T = len(self.target_text)
+        total_times = np.zeros(n_trials)
+        if T == 0 or n_trials == 0:
+            return total_times
+
+        session_wpm = np.maximum(10, rng.normal(self.target_wpm, WPM_STD, n_trials))
+        if metrics is not None:
+            metrics.runs += n_trials
+            metrics.rng_draws += n_trials
+            clock = time.perf_counter
+        base = 60 / (session_wpm * AVG_WORD_LENGTH)
+
+        # Typed buffers; rows are addressed through `rows` so compaction never copies them
+        buffers = np.zeros((n_trials, T + 1), dtype=self.code_dtype)
+        rows = np.arange(n_trials)
+
+        typed_len = np.zeros(n_trials, dtype=np.int64)       # == mental cursor position
+        correct_prefix = np.zeros(n_trials, dtype=np.int64)  # divergence point
+        fatigue = np.ones(n_trials)
+        elapsed = np.zeros(n_trials)
+        last_char = np.full(n_trials, self.none_code, dtype=np.int64)
+        last_bs = np.zeros(n_trials, dtype=bool)
+
+        text_codes = self.text_codes
+        max_steps = T * 10
+
+        for _ in range(max_steps + 1):
+            # --- Completion ---
+            finished = (correct_prefix == T) & (typed_len == T)
+            if finished.any():
+                total_times[rows[finished]] = elapsed[finished]
+                keep = ~finished
+                if not keep.any():
+                    return total_times
+                rows, typed_len, correct_prefix = rows[keep], typed_len[keep], correct_prefix[keep]
+                fatigue, elapsed, base = fatigue[keep], elapsed[keep], base[keep]
+                last_char, last_bs = last_char[keep], last_bs[keep]
+            m = len(rows)
+            if metrics is not None:
+                phase_start = clock()
+
+            # --- Monitoring & correction phase ---
+            has_error = correct_prefix < typed_len
+            last_typed = buffers[rows, np.maximum(typed_len - 1, 0)]
+            distance = typed_len - correct_prefix
+            u = rng.random(m)
+            correct = has_error & (
+                last_bs
+                | (typed_len >= T)
+                | self.is_separator[last_typed]
+                | ((distance >= 2) & (u < 0.8))
+                | ((distance == 1) & (u < PROB_NOTICE_ERROR))
+            )
+
+            reaction = np.maximum(0.1, rng.normal(TIME_REACTION_MEAN, TIME_REACTION_STD, m))
+            backspace = rng.normal(TIME_BACKSPACE_MEAN, TIME_BACKSPACE_STD, m)
+            elapsed += np.where(correct, np.where(last_bs, 0.0, reaction) + backspace, 0.0)
+            if metrics is not None:
+                # Draws MarkovTyper makes here: the notice check, then reaction and backspace times
+                checked = has_error & ~last_bs & (typed_len < T) & ~self.is_separator[last_typed]
+                metrics.rng_draws += int(checked.sum()) + int((correct & ~last_bs).sum()) + int(correct.sum())
+            typed_len -= correct
+            np.minimum(correct_prefix, typed_len, out=correct_prefix)
+            if metrics is not None:
+                typing_start = clock()
+                metrics.monitor_time += typing_start - phase_start
+
+            # --- Typing phase ---
+            typing = ~correct
+            pos = typed_len
+            intended = text_codes[pos]
+            following = text_codes[pos + 1]
+            fatigue *= np.where(typing, FATIGUE_FACTOR, 1.0)
+
+            swap = (
+                typing
+                & (following != self.none_code)
+                & ~self.is_space[following]
+                & (following != intended)
+                & (rng.random(m) < PROB_SWAP_ERROR)
+            )
+            error = typing & ~swap & (rng.random(m) < self.error_prob[pos])
+            pick = (rng.random(m) * self.neighbor_count[intended]).astype(np.int64)
+            wrong = self.neighbor_table[intended, pick]
+            char = np.where(swap, following, np.where(error, wrong, intended))
+
+            # Keystroke time, same factors as MarkovTyper._calculate_keystroke_time
+            t = base * fatigue * self.time_factor[pos] * self.transition[last_char, char]
+            t += self.add_penalty[char]
+            t += np.where(self.is_space[char], rng.normal(TIME_SPACE_PAUSE_MEAN, TIME_SPACE_PAUSE_STD, m), 0.0)
+            dt = np.maximum(0.02, rng.normal(t, TIME_KEYSTROKE_STD))
+            elapsed += np.where(typing, dt, 0.0)
+
+            if metrics is not None:
+                # Transition costs are looked up from the previous key (none before the first)
+                metrics.distance_lookups += int((typing & (last_char != self.none_code)).sum())
+
+            typed_rows = rows[typing]
+            buffers[typed_rows, pos[typing]] = char[typing]
+            correct_prefix += typing & (correct_prefix == pos) & (char == intended)
+            typed_len += typing
+            last_char = np.where(typing, char, last_char)
+            last_bs = correct
+
+            if metrics is not None:
+                metrics.typing_time += clock() - typing_start
+                keystrokes = int(typing.sum())
+                swaps = int(swap.sum())
+                errors = int(error.sum())
+                metrics.steps += m
+                metrics.keystrokes += keystrokes
+                metrics.backspaces += m - keystrokes
+                metrics.swaps += swaps
+                metrics.errors += errors
+                # Swap check where a swap is possible, error check unless swapped,
+                # neighbor pick on errors, space pause and keystroke time
+                swappable = typing & (following != self.none_code) & ~self.is_space[following] & (following != intended)
+                metrics.rng_draws += (int(swappable.sum()) + keystrokes - swaps + errors
+                                      + int((typing & self.is_space[char]).sum()) + keystrokes)
+                # Word difficulty for the error probability (not for swaps) and the keystroke time
+                metrics.word_lookups += 2 * keystrokes - swaps
+
+        # Step budget exhausted (mirrors the max_steps guard in MarkovTyper.run)
+        total_times[rows] = elapsed
+        return total_times
@@ -1,5 +1,6 @@
 import argparse
 from humantyping.simulation import run_monte_carlo, demo_single_run
+from humantyping.sweep import parse_grid, load_texts, run_sweep
 
 def main():
     typing_text = """from module import Class1
@@ -13,16 +14,33 @@ instance.method1()
 """
     parser = argparse.ArgumentParser(description="Keyboard Typing Simulation via Markov Chains")
     parser.add_argument("text", nargs="?", default=typing_text, help="The text to simulate")
-    parser.add_argument("--mode", choices=["demo", "montecarlo"], default="demo", help="Execution mode")
+    parser.add_argument("--mode", choices=["demo", "montecarlo", "sweep"], default="demo", help="Execution mode")
     parser.add_argument("--n", type=int, default=100, help="Number of simulations for Monte Carlo")
     parser.add_argument("--wpm", type=float, default=60.0, help="Target average speed (Words Per Minute)")
+    parser.add_argument("--engine", choices=["vectorized", "scalar"], default="vectorized", help="Monte Carlo engine")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for Monte Carlo (0 = one per CPU)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+    parser.add_argument("--fps", type=float, default=60, help="Maximum terminal refresh rate of the demo")
+    parser.add_argument("--grid", nargs="+", default=[], metavar="AXIS=V1,V2",
+                        help="Sweep grid, e.g. wpm=40,60,80 layout=qwerty,azerty n=1000 (defaults: --wpm, qwerty, --n)")
+    parser.add_argument("--texts", help="Directory of .txt files to sweep over (default: the text argument)")
+    parser.add_argument("--cache-dir", default=".sweep_cache", help="Directory of cached sweep cells")
+    parser.add_argument("--output", default="sweep_results.csv", help="Sweep results file (.csv or .tsv)")
     
     args = parser.parse_args()
     
     if args.mode == "demo":
-        demo_single_run(args.text, args.wpm)
+        demo_single_run(args.text, args.wpm, seed=args.seed, fps=args.fps)
     elif args.mode == "montecarlo":
-        run_monte_carlo(args.text, args.wpm, n_simulations=args.n)
+        run_monte_carlo(args.text, args.wpm, n_simulations=args.n, seed=args.seed, engine=args.engine, workers=args.workers)
+    elif args.mode == "sweep":
+        try:
+            grid = parse_grid(args.grid, defaults={"wpm": [args.wpm], "layout": ["qwerty"], "n": [args.n]})
+            texts = load_texts(args.texts) if args.texts else [("text", args.text)]
+        except (ValueError, OSError) as exc:
+            parser.error(str(exc))
+        run_sweep(texts, grid, seed=args.seed, engine=args.engine, workers=args.workers,
+                  cache_dir=args.cache_dir, output=args.output)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from humantyping import PlanCache, cache as cache_module
+
+SEED = 4
+TEXTS = ("first field", "second field", "third field")
+
+
+@pytest.fixture
+def generated(monkeypatch):
+    """Records the plans actually simulated (not served by a cache tier)."""
+    keys = []
+    build_plan = cache_module.build_plan
+
+    def counting(text, wpm, layout="qwerty", seed=None):
+        keys.append(text)
+        return build_plan(text, wpm, layout, seed)
+
+    monkeypatch.setattr(cache_module, "build_plan", counting)
+    return keys
+
+
+def plan_sizes():
+    sizes = PlanCache()
+    return {text: sizes.get(text, 60, seed=SEED).nbytes for text in TEXTS}
+
+
+def cached_texts(cache):
+    return [key[0] for key in cache._plans]
+
+
+def test_evicts_least_recently_used():
+    first, second, third = TEXTS
+    size = plan_sizes()
+    cache = PlanCache(max_bytes=sum(size.values()) - 1)
+
+    cache.get(first, 60, seed=SEED)
+    cache.get(second, 60, seed=SEED)
+    cache.get(first, 60, seed=SEED)  # hit: `second` is now the least recently used
+    cache.get(third, 60, seed=SEED)
+
+    assert cached_texts(cache) == [first, third]
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 3, 1)
+    assert cache.nbytes == size[first] + size[third]
+
+
+def test_stays_within_byte_limit():
+    size = plan_sizes()
+    limit = max(size.values()) + min(size.values())
+    cache = PlanCache(max_bytes=limit, variants=3)
+    for _ in range(4):
+        for text in TEXTS:
+            cache.next_plan(text, 60, seed=SEED)
+            assert cache.nbytes == sum(plan.nbytes for plan in cache._plans.values()) <= limit
+    assert cache.evictions > 0
+
+    # A plan larger than the whole budget is returned but not kept
+    tiny = PlanCache(max_bytes=min(size.values()) - 1)
+    assert len(tiny.get(TEXTS[0], 60, seed=SEED))
+    assert (len(tiny), tiny.nbytes) == (0, 0)
+
+
+def test_variants_rotate_per_key():
+    cache = PlanCache(variants=3)
+    first = [cache.next_plan(TEXTS[0], 60, seed=SEED) for _ in range(2)]
+    other = cache.next_plan(TEXTS[1], 60, seed=SEED)
+    first += [cache.next_plan(TEXTS[0], 60, seed=SEED) for _ in range(4)]
+
+    for i, plan in enumerate(first):
+        assert plan is cache.get(TEXTS[0], 60, seed=SEED, variant=i % 3)
+    assert other is cache.get(TEXTS[1], 60, seed=SEED, variant=0)
+    assert not np.array_equal(first[0]["time"], first[1]["time"])
+    assert not np.array_equal(first[1]["time"], first[2]["time"])
+    # Seeded pools are reproducible
+    assert np.array_equal(PlanCache(variants=3).get(TEXTS[0], 60, seed=SEED, variant=2), first[2])
+
+
+def test_disk_tier_round_trip(tmp_path, generated):
+    plan = PlanCache(cache_dir=str(tmp_path)).get(TEXTS[0], 60, seed=SEED)
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+    assert not list(tmp_path.glob("*.tmp"))
+
+    fresh = PlanCache(cache_dir=str(tmp_path))
+    loaded = fresh.get(TEXTS[0], 60, seed=SEED)
+
+    assert generated == [TEXTS[0]]
+    assert (fresh.misses, fresh.disk_hits) == (1, 1)
+    assert loaded.dtype == plan.dtype
+    assert np.array_equal(loaded, plan)
+    assert not loaded.flags.writeable
+
+
+def test_reloads_from_disk_after_memory_eviction(tmp_path, generated):
+    first, second, _ = TEXTS
+    size = plan_sizes()
+    del generated[:]
+    cache = PlanCache(max_bytes=max(size[first], size[second]), cache_dir=str(tmp_path))
+    plan = cache.get(first, 60, seed=SEED)
+    cache.get(second, 60, seed=SEED)
+    assert cached_texts(cache) == [second]
+
+    again = cache.get(first, 60, seed=SEED)
+
+    assert generated == [first, second]
+    assert cache.disk_hits == 1
+    assert np.array_equal(again, plan)
+    assert cached_texts(cache) == [first]
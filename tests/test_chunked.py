@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from humantyping.plan import iter_plan
+from humantyping.simulation import simulate_chunked, split_text
+from humantyping.typer import EventKind
+
+CHUNK = 80
+TEXT = ("First paragraph here. It has two sentences!\n\n\n"
+        + "Some more words without any sentence end " * 8
+        + "\n\nÇa va? Oui. Très bien! " * 6)
+SPLIT_CASES = [
+    TEXT,
+    "x" * 300,                            # no break at all: hard cuts
+    "word " * 100,                        # spaces only
+    "Short.",                             # a single piece
+    "Étés. " * 40 + "\n\n" + "漢字 " * 60,  # non-ASCII
+]
+
+
+def replay(plan):
+    typed = []
+    for _, kind, key in iter_plan(plan):
+        if kind == EventKind.BACKSPACE:
+            typed.pop()
+        else:
+            typed.append(key)
+    return "".join(typed)
+
+
+@pytest.mark.parametrize("text", SPLIT_CASES)
+def test_split_pieces_join_back(text):
+    pieces = split_text(text, CHUNK)
+    assert "".join(pieces) == text
+    assert all(pieces)
+    assert all(len(piece) <= CHUNK for piece in pieces[:-1])
+
+
+def test_split_prefers_paragraphs_then_sentences():
+    pieces = split_text(TEXT, CHUNK)
+    assert len(pieces) > 3
+    assert pieces[0] == "First paragraph here. It has two sentences!\n\n\n"
+    assert all(piece.endswith((" ", "\n")) for piece in pieces[:-1])
+
+
+def test_stitched_plan_is_continuous_and_replays_the_text():
+    total, plan = simulate_chunked(TEXT, 70, seed=1, workers=1, chunk_chars=CHUNK)
+
+    # One INIT record, then times strictly increase, also across piece boundaries
+    assert plan["kind"][0] == EventKind.INIT
+    assert np.count_nonzero(plan["kind"] == EventKind.INIT) == 1
+    assert np.all(np.diff(plan["time"]) > 0)
+    assert total == plan["time"][-1]
+    assert replay(plan) == TEXT
+
+
+def test_chunked_plan_does_not_depend_on_worker_count():
+    _, serial = simulate_chunked(TEXT, 70, seed=1, workers=1, chunk_chars=CHUNK)
+    _, parallel = simulate_chunked(TEXT, 70, seed=1, workers=3, chunk_chars=CHUNK)
+    assert np.array_equal(serial, parallel)
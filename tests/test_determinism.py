@@ -0,0 +1,107 @@
+"""
+Seeded plans must not change: regression suites replay them, and refactors of
+the simulator are checked against these pinned streams. Update the expected
+values only for a deliberate change of the model or of its random stream.
+"""
+import hashlib
+from dataclasses import fields
+from operator import attrgetter
+
+import numpy as np
+import pytest
+
+from humantyping import HumanTyper, MarkovTyper, simulation
+from humantyping.simulation import run_monte_carlo
+from humantyping.typer import EventKind
+
+GOLDEN_STREAM = [
+    (0.0, EventKind.INIT, ''),
+    (0.14589188518342613, EventKind.TYPED, 't'),
+    (0.16589188518342612, EventKind.TYPED_ERROR, 'g'),
+    (0.7243714333929345, EventKind.BACKSPACE, ''),
+    (0.7801656178080096, EventKind.TYPED, 'h'),
+    (0.8486059507846907, EventKind.TYPED, 'e'),
+    (1.238205826301025, EventKind.TYPED, ' '),
+    (1.4439224313859815, EventKind.TYPED, 'c'),
+    (1.61465040398823, EventKind.TYPED, 'a'),
+    (1.7496912675880452, EventKind.TYPED, 't'),
+    (2.304915785948424, EventKind.TYPED, ' '),
+    (2.5617546094751233, EventKind.TYPED, 's'),
+    (2.686172176379128, EventKind.TYPED, 'a'),
+    (2.7593629991601776, EventKind.TYPED, 't'),
+]
+
+# (text, wpm, layout, seed) -> (total time, events, SHA-256 of the event stream)
+GOLDEN_DIGESTS = [
+    (("Hello world, this is a realistic typing test.", 60, "qwerty", 1),
+     (8.877291333239787, 48, "3166079c5165597973d267d09ebeb49622e67fc662540eca2d89df14e919a729")),
+    (("Ça va? Être ou ne pas être, voilà la question.", 45, "azerty", 7),
+     (18.148723204925457, 59, "3850674446b5f7ad29a34b085885ac9edb9b6be2153d42443c2df361aa88467d")),
+    (("def example():\n    return Class1(keyword_arg=value)\n", 90, "qwerty", 12345),
+     (14.272653627663829, 67, "432639e07b894a4e6fff3aeb438756df160b789424617accd729b173ae77b933")),
+]
+
+
+def stream_digest(history):
+    digest = hashlib.sha256()
+    for t, kind, key in history:
+        digest.update(f"{t.hex()} {int(kind)} {key}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def replay_text(history):
+    typed = []
+    for _, kind, key in history:
+        if kind == EventKind.BACKSPACE:
+            typed.pop()
+        elif kind != EventKind.INIT:
+            typed.append(key)
+    return "".join(typed)
+
+
+def test_pinned_event_stream():
+    total, history = MarkovTyper("the cat sat", 60, seed=9).run()
+    assert list(history) == GOLDEN_STREAM
+    assert total == GOLDEN_STREAM[-1][0]
+
+
+@pytest.mark.parametrize("params, expected", GOLDEN_DIGESTS)
+def test_pinned_stream_digests(params, expected):
+    text, wpm, layout, seed = params
+    total, history = MarkovTyper(text, wpm, layout, seed=seed).run()
+    assert (total, len(history), stream_digest(history)) == expected
+    assert replay_text(history) == text
+
+
+def test_same_seed_same_stream_and_streaming_matches_run():
+    text = GOLDEN_DIGESTS[0][0][0]
+    total, history = MarkovTyper(text, seed=21).run()
+    again_total, again = MarkovTyper(text, seed=21).run()
+    assert (again_total, list(again)) == (total, list(history))
+    assert list(MarkovTyper(text, seed=21).iter_events()) == list(history)[1:]
+    assert MarkovTyper(text, seed=22).run()[0] != total
+
+
+def test_seeded_human_typer_replays_the_same_plans():
+    first = HumanTyper(seed=5)
+    second = HumanTyper(seed=5)
+    for text in ("first field", "second field", "first field"):
+        assert list(first._events(text)) == list(second._events(text))
+
+
+@pytest.mark.parametrize("engine", ["vectorized", "scalar"])
+def test_monte_carlo_does_not_depend_on_worker_count(engine, monkeypatch):
+    # Small chunks so the trials are spread over several workers
+    monkeypatch.setattr(simulation, "CHUNK_TRIALS", {"vectorized": 300, "scalar": 300})
+    kwargs = dict(n_simulations=1000, seed=42, engine=engine, hist_edges=np.linspace(0, 10, 21),
+                  instrument=True, verbose=False)
+    serial = run_monte_carlo("the quick brown fox", 70, workers=1, **kwargs)
+    parallel = run_monte_carlo("the quick brown fox", 70, workers=3, **kwargs)
+
+    assert serial.n == parallel.n == 1000
+    summary = attrgetter("mean", "std", "min", "max", "quantiles", "underflow", "overflow")
+    assert summary(serial) == summary(parallel)
+    assert np.array_equal(serial.hist_counts, parallel.hist_counts)
+    # Counters only: the *_time fields are wall-clock measurements
+    counters = [f.name for f in fields(serial.metrics) if not f.name.endswith("_time")]
+    assert attrgetter(*counters)(serial.metrics) == attrgetter(*counters)(parallel.metrics)
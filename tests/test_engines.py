@@ -0,0 +1,38 @@
+"""
+The vectorized engine must sample the same distribution as MarkovTyper. The
+engines use different random streams, so they are compared statistically.
+"""
+import math
+
+import pytest
+
+from humantyping.simulation import run_monte_carlo
+
+TRIALS = 2000
+CASES = [
+    ("The quick brown fox, jumps. Ça va?", 60, "qwerty"),
+    ("Être ou ne pas être, voilà la question.", 45, "azerty"),
+    ("def f(x):\n    return x + 1\n", 90, "qwerty"),
+]
+# Tolerances of about 3-4 standard errors at TRIALS sessions. Mean: in standard
+# errors of the difference; p90: in standard deviations of the total time (its
+# sampling error is a fraction of it); std and counts: relative. Swaps are rare,
+# and backspaces come in runs, so they are noisier
+MEAN_Z = 4.0
+P90_STD = 0.3
+TOLERANCES = {"std": 0.12, "errors": 0.08, "swaps": 0.15, "backspaces": 0.1}
+
+
+@pytest.mark.parametrize("text, wpm, layout", CASES)
+def test_vectorized_matches_scalar(text, wpm, layout):
+    scalar, vectorized = (run_monte_carlo(text, wpm, TRIALS, seed=3, engine=engine, layout=layout,
+                                          instrument=True, verbose=False)
+                          for engine in ("scalar", "vectorized"))
+
+    standard_error = math.sqrt((scalar.std ** 2 + vectorized.std ** 2) / TRIALS)
+    assert abs(vectorized.mean - scalar.mean) < MEAN_Z * standard_error
+    assert abs(vectorized.p90 - scalar.p90) < P90_STD * scalar.std
+    assert vectorized.std == pytest.approx(scalar.std, rel=TOLERANCES["std"])
+    for name in ("errors", "swaps", "backspaces"):
+        expected = getattr(scalar.metrics, name)
+        assert getattr(vectorized.metrics, name) == pytest.approx(expected, rel=TOLERANCES[name]), name
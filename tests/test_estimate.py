@@ -0,0 +1,48 @@
+import pytest
+
+from humantyping.estimate import estimate_duration
+from humantyping.simulation import run_monte_carlo
+
+# Model error of the analytic estimate plus Monte Carlo sampling error at N_TRIALS
+MEAN_TOLERANCE = 0.025
+STD_TOLERANCE = 0.10
+N_TRIALS = 4000
+
+TEXTS = {
+    "short": "Hello world, this is a test.",
+    "accents": "The quick brown fox jumps over the lazy dog. Ça va? Être ou ne pas être.",
+    "code": (
+        "from module import Class1\n"
+        "import asyncio\n\n"
+        "async def example():\n"
+        "    instance = Class1(keyword_arg=value)\n"
+        "    await instance.method1()\n"
+    ),
+}
+
+
+@pytest.mark.parametrize("layout", ["qwerty", "azerty"])
+@pytest.mark.parametrize("wpm", [40, 90])
+@pytest.mark.parametrize("name", sorted(TEXTS))
+def test_estimate_matches_monte_carlo(name, wpm, layout):
+    text = TEXTS[name]
+    simulated = run_monte_carlo(text, wpm, N_TRIALS, seed=3, layout=layout, verbose=False)
+    estimate = estimate_duration(text, wpm, layout)
+    assert estimate.mean == pytest.approx(simulated.mean, rel=MEAN_TOLERANCE)
+    assert estimate.std == pytest.approx(simulated.std, rel=STD_TOLERANCE)
+
+
+def test_estimate_matches_scalar_engine():
+    text = TEXTS["accents"]
+    simulated = run_monte_carlo(text, 60, 1000, seed=5, engine="scalar", verbose=False)
+    estimate = estimate_duration(text, 60)
+    assert estimate.mean == pytest.approx(simulated.mean, rel=MEAN_TOLERANCE)
+    assert estimate.std == pytest.approx(simulated.std, rel=STD_TOLERANCE)
+
+
+def test_estimate_is_deterministic_and_grows_with_text():
+    short = estimate_duration("hello", 60)
+    assert estimate_duration("hello", 60) == short
+    longer = estimate_duration("hello hello", 60)
+    assert longer.mean > short.mean
+    assert longer.keystrokes > short.keystrokes
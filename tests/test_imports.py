@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_probe(code):
+    subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True)
+
+
+def test_package_import_does_not_load_numpy():
+    run_probe("import humantyping, sys; assert 'numpy' not in sys.modules")
+
+
+def test_importing_the_typers_does_not_load_numpy():
+    run_probe("from humantyping import HumanTyper, MarkovTyper; import sys; assert 'numpy' not in sys.modules")
@@ -0,0 +1,53 @@
+import pytest
+
+from humantyping.instrumentation import TyperMetrics
+from humantyping.simulation import run_monte_carlo
+from humantyping.typer import MarkovTyper
+
+TEXT = "The quick brown fox, jumps. Ça va?"
+# Relative tolerance between engines (sampling noise at 3000 trials; backspaces are rare)
+COUNTER_TOLERANCES = {"steps": 0.02, "keystrokes": 0.02, "backspaces": 0.08,
+                      "rng_draws": 0.03, "word_lookups": 0.02, "distance_lookups": 0.02}
+
+
+@pytest.mark.parametrize("metrics", [None, False])
+def test_metrics_off(metrics):
+    typer = MarkovTyper(TEXT, seed=1, metrics=metrics)
+    total, _ = typer.run()
+    assert typer.metrics is None
+    assert total > 0
+
+
+def test_metrics_true_collects_without_changing_the_plan():
+    plain_total, plain = MarkovTyper(TEXT, seed=1).run()
+    typer = MarkovTyper(TEXT, seed=1, metrics=True)
+    total, history = typer.run()
+
+    assert (total, list(history)) == (plain_total, list(plain))
+    assert typer.metrics.runs == 1
+    assert typer.metrics.steps == len(history) - 1  # without the INIT event
+
+
+def test_shared_metrics_and_sinks():
+    total = TyperMetrics()
+    seen = []
+    for seed in range(3):
+        MarkovTyper(TEXT, seed=seed, metrics=total, sinks=[seen.append]).run()
+    assert total.runs == 3 == len(seen)
+    assert total.keystrokes == sum(m.keystrokes for m in seen)
+
+
+@pytest.mark.parametrize("engine", ["scalar", "vectorized"])
+def test_counter_definitions(engine):
+    m = run_monte_carlo(TEXT, 60, 500, seed=2, engine=engine, instrument=True, verbose=False).metrics
+    assert m.steps == m.keystrokes + m.backspaces
+    assert m.word_lookups == 2 * m.keystrokes - m.swaps
+    assert m.distance_lookups == m.keystrokes - m.runs
+
+
+def test_engines_count_the_same_things():
+    scalar = run_monte_carlo(TEXT, 60, 3000, seed=1, engine="scalar", instrument=True, verbose=False).metrics
+    vectorized = run_monte_carlo(TEXT, 60, 3000, seed=1, engine="vectorized", instrument=True, verbose=False).metrics
+    assert scalar.runs == vectorized.runs
+    for name, tolerance in COUNTER_TOLERANCES.items():
+        assert getattr(vectorized, name) == pytest.approx(getattr(scalar, name), rel=tolerance), name
@@ -0,0 +1,74 @@
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.fakes import FakeLocator, VirtualClock
+from humantyping import HumanTyper
+from humantyping.integration import OFFLOAD_CHARS, STREAM_HEAD_CHARS
+
+SEED = 8
+TEXT = "Long texts are planned in an executor while their first words are typed. " * 20
+
+
+class InlineExecutor(Executor):
+    """Runs every job at once, so planned pieces are always ready."""
+
+    def __init__(self):
+        self.jobs = 0
+
+    def submit(self, fn, *args, **kwargs):
+        self.jobs += 1
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+class StalledExecutor(ThreadPoolExecutor):
+    """One worker, kept busy until `release` (or for at most 10 s)."""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.release = threading.Event()
+        self.freed = threading.Event()
+        self.submit(self._hold)
+
+    def _hold(self):
+        self.release.wait(10)
+        self.freed.set()
+
+
+@pytest.fixture
+def stalled():
+    executor = StalledExecutor()
+    yield executor
+    executor.release.set()
+    executor.shutdown()
+
+
+def type_text(executor):
+    locator = FakeLocator(latency=0.02)
+    report = VirtualClock().run(HumanTyper(seed=SEED, executor=executor).type(locator, TEXT))
+    return report, locator
+
+
+def test_typing_starts_before_the_plan_is_ready(stalled):
+    assert len(TEXT) >= OFFLOAD_CHARS > STREAM_HEAD_CHARS
+    report, locator = type_text(stalled)
+
+    # The executor never got to plan anything, yet the first key went out at once
+    # and the rest was simulated live
+    assert not stalled.freed.is_set()
+    assert locator.keys[0][0] < 1.0
+    assert "".join(locator.text) == TEXT
+    assert report.events == len(locator.keys)
+
+
+def test_events_do_not_depend_on_executor_timing(stalled):
+    inline = InlineExecutor()
+    _, ready = type_text(inline)
+    _, late = type_text(stalled)
+
+    assert inline.jobs == 1
+    assert ready.keys == late.keys
+    assert "".join(ready.text) == TEXT
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from benchmarks.fakes import FakeLocator
+from humantyping import HumanTyper, MarkovTyper
+from humantyping.plan import PLAN_DTYPE, iter_plan, load_plan, save_plan
+
+TEXT = "Hello plan, replayed without the simulator."
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIMULATOR_MODULES = ("humantyping.typer", "humantyping.keyboard", "humantyping.language", "humantyping.rng")
+
+
+def test_export_and_load_round_trip(tmp_path):
+    typer = MarkovTyper(TEXT, target_wpm=300, seed=4)
+    total, history = typer.run()
+    path = typer.export_plan(tmp_path / "hello")
+
+    assert path == str(tmp_path / "hello.npz")
+    for name in (tmp_path / "hello", path):
+        plan, meta = load_plan(name)
+        assert plan.dtype == PLAN_DTYPE
+        assert list(iter_plan(plan)) == list(history)[1:]
+        assert meta["events"] == len(history)
+        assert meta["duration"] == total
+
+
+def test_save_plan_returns_real_path(tmp_path):
+    plan = MarkovTyper("abc", seed=1).run()[1].to_array()
+    assert save_plan(tmp_path / "p.npz", plan, "abc") == str(tmp_path / "p.npz")
+    assert save_plan(tmp_path / "q", plan, "abc") == str(tmp_path / "q.npz")
+
+
+def test_replay_without_suffix(tmp_path):
+    MarkovTyper(TEXT, target_wpm=300, seed=4).export_plan(tmp_path / "hello")
+    locator = FakeLocator()
+    report = asyncio.run(HumanTyper(offload_threshold=float("inf")).replay(locator, str(tmp_path / "hello")))
+    assert "".join(locator.text) == TEXT
+    assert report.events > 0
+
+
+def test_replay_does_not_import_the_simulator(tmp_path):
+    path = MarkovTyper("Hi!", target_wpm=300, seed=2).export_plan(tmp_path / "hi")
+    probe = f"""
+import asyncio, json, sys
+from benchmarks.fakes import FakeLocator
+from humantyping.plan import load_plan
+from humantyping import HumanTyper
+
+locator = FakeLocator()
+plan, _ = load_plan({path!r})
+asyncio.run(HumanTyper().replay(locator, plan))
+print(json.dumps(["".join(locator.text), sorted(m for m in sys.modules if m.startswith("humantyping"))]))
+"""
+    out = subprocess.run([sys.executable, "-c", probe], cwd=REPO_ROOT, check=True, capture_output=True, text=True).stdout
+    typed, modules = json.loads(out)
+    assert typed == "Hi!"
+    assert not set(SIMULATOR_MODULES) & set(modules), modules
+
+
+def test_empty_plan(tmp_path):
+    path = save_plan(tmp_path / "empty", np.empty(0, dtype=PLAN_DTYPE), "")
+    plan, meta = load_plan(path)
+    assert len(plan) == 0 and meta["events"] == 0
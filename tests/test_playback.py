@@ -0,0 +1,123 @@
+import pytest
+
+from benchmarks.fakes import FakeLocator, VirtualClock
+from humantyping import HumanTyper
+from humantyping.plan import build_plan, iter_plan
+from humantyping.playback import PlaybackClock
+from humantyping.typer import EventKind
+
+LATENCY = 0.1
+
+
+def burst_plan(bursts=60, keys=5, gap=0.02, pause=0.5):
+    """Bursts of keys closer together than the driver round-trip, separated by pauses."""
+    plan = []
+    t = 0.0
+    for _ in range(bursts):
+        for _ in range(keys):
+            t += gap
+            plan.append((round(t, 6), EventKind.TYPED, "a"))
+        t += pause
+    return plan
+
+
+def play(plan, coalesce):
+    typer = HumanTyper(coalesce=coalesce)
+    typer._events = lambda text: iter(plan)
+    locator = FakeLocator(latency=LATENCY)
+    report = VirtualClock().run(typer.type(locator, "unused"))
+    return report, locator
+
+
+def test_coalesced_bursts_land_on_schedule():
+    plan = burst_plan()
+    report, locator = play(plan, coalesce=True)
+
+    assert report.events == len(plan)
+    assert report.dispatches < len(plan) / 2
+    assert "".join(locator.text) == "a" * len(plan)
+    # Once the round-trip is measured, every key lands on its planned time
+    offsets = [landed - t for (landed, _), (t, _, _) in zip(locator.keys, plan)]
+    settled = offsets[len(offsets) // 2:]
+    assert max(abs(offset) for offset in settled) < 0.001
+    assert abs(report.dispatch_latency - LATENCY) < 0.001
+    # The call of the last burst holds its last key for one gap
+    assert 0 <= report.drift < 0.03
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_clock_deadlines_are_absolute():
+    now = ManualClock()
+    clock = PlaybackClock(now)
+    clock.start()
+    assert clock.delay_until(0.5) == 0.5
+    now.now += 0.3  # time spent elsewhere is not added to later deadlines
+    assert clock.delay_until(0.5) == pytest.approx(0.2)
+    now.now += 1.0
+    assert clock.delay_until(0.5) == pytest.approx(-0.8)
+
+
+def test_clock_record_statistics_and_busy():
+    now = ManualClock()
+    clock = PlaybackClock(now, smoothing=0.5)
+    clock.start()
+
+    sent = now.now + 0.5
+    now.now = sent + 0.1                     # 100 ms round-trip
+    clock.record(0.5, sent)
+    assert clock.latency == pytest.approx(0.05)
+
+    sent = now.now + 0.9
+    now.now = sent + 0.1 + 0.3               # same round-trip, plus 300 ms of intended typing delay
+    clock.record(1.8, sent, events=4, busy=0.3)
+    assert clock.latency == pytest.approx(0.075)
+
+    report = clock.report()
+    assert report.events == 5
+    assert report.dispatches == 2
+    assert report.max_lag == pytest.approx(0.1)
+    assert report.mean_lag == pytest.approx(0.1)
+    assert report.planned_duration == 1.8
+    assert report.actual_duration == pytest.approx(1.9)
+    assert report.drift == pytest.approx(0.1)
+
+
+def test_drift_stays_bounded_over_a_long_plan():
+    # A real plan of ~3000 events against a slow element (50 ms round-trip), uncoalesced
+    plan_array = build_plan("The quick brown fox jumps over the lazy dog. " * 60, 60, seed=3)
+    plan = list(iter_plan(plan_array))
+    locator = FakeLocator(latency=0.05)
+    report = VirtualClock().run(HumanTyper().replay(locator, plan_array))
+
+    assert report.events == len(plan) > 2500
+    assert abs(report.drift) < 0.06
+    assert report.max_lag < 0.1
+    assert report.mean_lag < 0.001
+    assert abs(report.dispatch_latency - 0.05) < 1e-6
+    # Keys planned closer together than the round-trip land late, but deadlines are
+    # absolute: every key with room for the round-trip (and a free element) is on time
+    on_time = [landed - t for i, ((landed, _), (t, _, _)) in enumerate(zip(locator.keys, plan))
+               if i >= 20 and t - plan[i - 1][0] >= 0.1 and t - plan[i - 2][0] >= 0.2]
+    assert len(on_time) > 0.8 * len(plan)
+    assert max(abs(offset) for offset in on_time) < 0.001
+
+
+def test_falling_behind_catches_up_after_a_pause():
+    # Keys every 20 ms on a 50 ms element cannot keep up, then a 2 s pause
+    plan = [(0.02 * (i + 1), EventKind.TYPED, "a") for i in range(50)] + [(3.0, EventKind.TYPED, "b")]
+    typer = HumanTyper()
+    typer._events = lambda text: iter(plan)
+    locator = FakeLocator(latency=0.05)
+    report = VirtualClock().run(typer.type(locator, "unused"))
+
+    assert report.max_lag > 1.0
+    landed_last = locator.keys[-1][0]
+    assert abs(landed_last - 3.0) < 0.001
+    assert abs(report.drift) < 0.001
@@ -0,0 +1,81 @@
+import io
+
+from humantyping.render import TerminalRenderer, play
+from humantyping.typer import EventKind
+
+FPS = 50
+INTERVAL = 1.0 / FPS
+
+
+class FakeTime:
+    """Manual clock; sleeping advances it exactly."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, delay):
+        assert delay > 0
+        self.now += delay
+
+
+class RecordingRenderer(TerminalRenderer):
+    """Keeps when each event was applied and when each frame was written."""
+
+    def __init__(self, fake, cost=0.0):
+        super().__init__(io.StringIO())
+        self.fake = fake
+        self.cost = cost
+        self.applied = []
+        self.frames = []
+
+    def apply(self, kind, key):
+        super().apply(kind, key)
+        self.applied.append(self.fake.now)
+        self.fake.now += self.cost  # drawing is slow when cost > 0
+
+    def flush(self):
+        if self.pending:
+            self.frames.append((self.fake.now, len(self.applied)))
+        super().flush()
+
+
+def staleness(renderer):
+    """Longest time between applying an event and writing the frame that shows it."""
+    worst = 0.0
+    shown = 0
+    for at, upto in renderer.frames:
+        worst = max([worst] + [at - applied for applied in renderer.applied[shown:upto]])
+        shown = upto
+    assert shown == len(renderer.applied)
+    return worst
+
+
+def typed(n, gap):
+    return [((i + 1) * gap, EventKind.TYPED, "a") for i in range(n)]
+
+
+def test_frames_on_schedule():
+    fake = FakeTime()
+    renderer = RecordingRenderer(fake)
+    elapsed = play(typed(400, 0.005), renderer, fps=FPS, clock=fake.clock, sleep=fake.sleep)
+
+    assert elapsed == 2.0
+    assert renderer.stream.getvalue() == "a" * 400
+    assert abs(len(renderer.frames) - elapsed / INTERVAL) <= 2
+    assert staleness(renderer) <= INTERVAL + 1e-9
+
+
+def test_frames_while_behind_schedule():
+    # Every event takes 10 ms to draw but is planned 5 ms after the previous one,
+    # so playback is behind from the start and never sleeps
+    fake = FakeTime()
+    renderer = RecordingRenderer(fake, cost=0.01)
+    elapsed = play(typed(400, 0.005), renderer, fps=FPS, clock=fake.clock, sleep=fake.sleep)
+
+    assert elapsed > 2 * 400 * 0.005
+    # Frames can only be written between events, so at most one draw late
+    assert elapsed / (INTERVAL + 0.01) - 1 <= len(renderer.frames) <= elapsed / INTERVAL + 1
+    assert staleness(renderer) <= INTERVAL + 0.01 + 1e-9
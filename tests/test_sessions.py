@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+
+from benchmarks.fakes import FakeLocator
+from humantyping import HumanTyper
+from humantyping.sessions import SessionScheduler
+from humantyping.typer import EventKind
+
+DISPATCH_TIME = 0.05
+
+
+def _events(n):
+    return iter([(i * 0.01, EventKind.TYPED, "a") for i in range(n)])
+
+
+def test_page_queue_does_not_starve_other_pages():
+    browser = SimpleNamespace()
+    page_a = SimpleNamespace(context=SimpleNamespace(browser=browser))
+    page_b = SimpleNamespace(context=SimpleNamespace(browser=browser))
+    scheduler = SessionScheduler(max_per_page=1, max_per_browser=2)
+    for _ in range(6):
+        scheduler.add(FakeLocator(latency=DISPATCH_TIME, page=page_a), _events(3))
+    scheduler.add(FakeLocator(latency=DISPATCH_TIME, page=page_b), _events(3))
+
+    reports = asyncio.run(scheduler.run())
+
+    # Page A is saturated by its own queue, but page B keeps the browser's second slot
+    assert reports[-1].events == 3
+    assert reports[-1].max_lag < 3 * DISPATCH_TIME
+    assert max(report.max_lag for report in reports[:-1]) > 6 * DISPATCH_TIME
+
+
+class SlowCancelLocator(FakeLocator):
+    """Cancelled mid-call, releases its key after another round-trip (like a real driver)."""
+
+    async def type(self, text, delay=0):
+        try:
+            await super().type(text, delay)
+        except asyncio.CancelledError:
+            await asyncio.sleep(self.latency)
+            self._land("release")
+            raise
+
+
+def test_cancelling_type_many_stops_every_dispatch():
+    text = "cancel me " * 20
+    locators = [SlowCancelLocator(latency=DISPATCH_TIME, page=SimpleNamespace()) for _ in range(4)]
+
+    async def main():
+        task = asyncio.create_task(HumanTyper(seed=1).type_many((locator, text) for locator in locators))
+        await asyncio.sleep(1.0)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        else:
+            raise AssertionError("type_many finished before it was cancelled")
+        # Every dispatch has wound down by the time the cancellation is delivered
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+        landed = [list(locator.keys) for locator in locators]
+        await asyncio.sleep(1.0)
+        return landed
+
+    landed = asyncio.run(main())
+
+    assert all(0 < len(keys) < len(text) for keys in landed)
+    assert [locator.keys for locator in locators] == landed
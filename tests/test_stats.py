@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from humantyping.stats import QuantileSketch, StreamingStats
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    values = np.random.default_rng(0).lognormal(2.0, 1.5, 20_000)
+    sketch = QuantileSketch(relative_accuracy=0.005)
+    sketch.update(values)
+    for q in (0.5, 0.9, 0.99):
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q, method="lower"), rel=0.011)
+
+
+def test_sketch_grows_above_initial_range():
+    # Long texts take well over max_value seconds; their quantiles must not be clamped
+    values = np.linspace(1.4e7, 2.4e7, 101)
+    sketch = QuantileSketch(max_value=1e6)
+    sketch.update(values)
+    assert sketch.count == len(values)
+    assert sketch.quantile(0.0) == pytest.approx(1.4e7, rel=0.01)
+    assert sketch.quantile(0.5) == pytest.approx(1.9e7, rel=0.01)
+    assert sketch.quantile(1.0) == pytest.approx(2.4e7, rel=0.01)
+
+
+def test_sketch_merge_different_sizes():
+    small, large = QuantileSketch(), QuantileSketch()
+    small.update([1.0, 2.0])
+    large.update([1e8])
+    small.merge(large)
+    assert small.count == 3
+    assert small.quantile(1.0) == pytest.approx(1e8, rel=0.01)
+
+
+def test_streaming_stats_tail_quantiles_on_large_times():
+    values = np.random.default_rng(1).normal(1.9e7, 2e6, 500)
+    stats = StreamingStats()
+    for chunk in np.array_split(values, 5):
+        part = StreamingStats()
+        part.update(chunk)
+        stats.merge(part)
+    result = stats.result()
+    assert result.mean == pytest.approx(values.mean())
+    assert result.p50 == pytest.approx(np.median(values), rel=0.01)
+    assert result.p99 == pytest.approx(np.quantile(values, 0.99), rel=0.01)
+    assert result.min < result.p50 < result.p90 < result.p99 <= result.max
@@ -0,0 +1,70 @@
+import csv
+import os
+
+import pytest
+
+import humantyping
+from humantyping import sweep
+
+TEXTS = [("a.txt", "hello world"), ("b.txt", "the cat sat")]
+GRID = {"wpm": [40.0, 80.0], "layout": ["qwerty"], "n": [20]}
+N_CELLS = 4
+
+
+@pytest.fixture
+def computed(monkeypatch):
+    """Records the cells actually simulated (not read from the cache)."""
+    cells = []
+    run_cell = sweep._run_cell
+
+    def counting(text, wpm, layout, n, seed, engine):
+        cells.append((text, wpm))
+        return run_cell(text, wpm, layout, n, seed, engine)
+
+    monkeypatch.setattr(sweep, "_run_cell", counting)
+    return cells
+
+
+def run(tmp_path, texts=TEXTS):
+    return sweep.run_sweep(texts, GRID, seed=5, cache_dir=str(tmp_path / "cache"),
+                           output=str(tmp_path / "out.csv"), verbose=False)
+
+
+def test_rerun_reads_every_cell_from_cache(tmp_path, computed):
+    first = run(tmp_path)
+    assert len(computed) == N_CELLS
+    assert not any(row["cached"] for row in first)
+
+    second = run(tmp_path)
+    assert len(computed) == N_CELLS
+    assert all(row["cached"] for row in second)
+    assert [dict(row, cached=None) for row in second] == [dict(row, cached=None) for row in first]
+    with open(tmp_path / "out.csv", encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == N_CELLS
+
+
+def test_interrupted_sweep_resumes_unfinished_cells(tmp_path, computed):
+    run(tmp_path)
+    cache = tmp_path / "cache"
+    # Drop one finished cell, as if the sweep had stopped before storing it
+    victim = sweep._cache_path(str(cache), sweep._cell_key("the cat sat", 80.0, "qwerty", 20, 5, "vectorized"))
+    os.remove(victim)
+    del computed[:]
+
+    rows = run(tmp_path)
+
+    assert computed == [("the cat sat", 80.0)]
+    assert [row["cached"] for row in rows] == [True, True, True, False]
+
+
+def test_changed_text_or_version_is_recomputed(tmp_path, computed, monkeypatch):
+    run(tmp_path)
+    del computed[:]
+
+    run(tmp_path, [("a.txt", "hello world"), ("b.txt", "the dog sat")])
+    assert computed == [("the dog sat", 40.0), ("the dog sat", 80.0)]
+    del computed[:]
+
+    monkeypatch.setattr(humantyping, "__version__", humantyping.__version__ + ".post1")
+    run(tmp_path)
+    assert len(computed) == N_CELLS
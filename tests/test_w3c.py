@@ -0,0 +1,142 @@
+import pytest
+
+pytest.importorskip("selenium")
+
+from benchmarks.fakes import FakeDriver, FakeWebElement
+from humantyping import HumanTyper, integration
+from humantyping.integration import W3C_BATCH_KEYS
+from humantyping.typer import EventKind
+
+SEED = 7
+# WebDriver key codes (selenium Keys.BACK_SPACE / ARROW_LEFT / ARROW_RIGHT)
+BACK_SPACE, ARROW_LEFT, ARROW_RIGHT = "\ue003", "\ue012", "\ue014"
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    # Chunks wait for their planned start; the payloads do not depend on it
+    monkeypatch.setattr(integration.time, "sleep", lambda delay: None)
+
+
+def key_actions(payload):
+    (device,) = payload["actions"]
+    return device["actions"]
+
+
+def key_downs(payload):
+    return [action["value"] for action in key_actions(payload) if action["type"] == "keyDown"]
+
+
+def planned_events(text):
+    # A HumanTyper with the same seed replays the same first plan
+    return list(HumanTyper(seed=SEED)._events(text))
+
+
+def test_chunks_at_batch_size():
+    text = "The quick brown fox jumps over the lazy dog. " * 25
+    events = planned_events(text)
+    driver = FakeDriver(record=True)
+
+    report = HumanTyper(seed=SEED).type_appium(driver, text, batch=True)
+
+    assert len(events) > 2 * W3C_BATCH_KEYS
+    sizes = [len(key_downs(payload)) for payload in driver.payloads]
+    assert sizes[:-1] == [W3C_BATCH_KEYS] * (len(sizes) - 1)
+    assert 0 < sizes[-1] <= W3C_BATCH_KEYS
+    assert sum(sizes) == len(events) == report.events
+    assert report.dispatches == len(driver.payloads)
+
+
+def test_only_key_source_is_sent():
+    driver = FakeDriver(record=True)
+    HumanTyper(seed=SEED).type_appium(driver, "Hello 'W3C' world", batch=True)
+
+    for payload in driver.payloads:
+        assert [device["type"] for device in payload["actions"]] == ["key"]
+        assert {action["type"] for action in key_actions(payload)} <= {"keyDown", "keyUp", "pause"}
+
+
+def test_pauses_follow_plan_timestamps():
+    text = "Pauses carry the planned gaps between keystrokes, chunk by chunk. " * 12
+    events = planned_events(text)
+    driver = FakeDriver(record=True)
+    HumanTyper(seed=SEED).type_appium(driver, text, batch=True)
+
+    start = 0
+    for payload in driver.payloads:
+        actions = key_actions(payload)
+        chunk = events[start:start + len(key_downs(payload))]
+        start += len(chunk)
+
+        # The pause before each key is the gap between rounded planned times
+        gaps = []
+        pause = 0
+        for action in actions:
+            if action["type"] == "pause":
+                pause += action["duration"]
+            elif action["type"] == "keyDown":
+                gaps.append(pause)
+                pause = 0
+        times_ms = [round(t * 1000) for t, _, _ in chunk]
+        assert gaps == [0] + [b - a for a, b in zip(times_ms, times_ms[1:])]
+        total = sum(gaps)
+        assert abs(total - (chunk[-1][0] - chunk[0][0]) * 1000) <= 1
+    assert start == len(events)
+
+
+def test_special_keys_and_quotes(monkeypatch):
+    plan = [
+        (0.10, EventKind.TYPED, '"'),
+        (0.20, EventKind.TYPED, "'"),
+        (0.30, EventKind.TYPED_ERROR, "x"),
+        (0.45, EventKind.BACKSPACE, ""),
+        (0.60, EventKind.ARROW_LEFT, ""),
+        (0.70, EventKind.ARROW_RIGHT, ""),
+        (0.85, EventKind.TYPED, "\\"),
+    ]
+    typer = HumanTyper(seed=SEED)
+    monkeypatch.setattr(typer, "_events", lambda text: iter(plan))
+    driver = FakeDriver(record=True)
+
+    typer.type_appium(driver, "unused", batch=True)
+
+    (payload,) = driver.payloads
+    assert key_downs(payload) == ['"', "'", "x", BACK_SPACE, ARROW_LEFT, ARROW_RIGHT, "\\"]
+    ups = [action["value"] for action in key_actions(payload) if action["type"] == "keyUp"]
+    assert ups == key_downs(payload)
+    pauses = [action["duration"] for action in key_actions(payload) if action["type"] == "pause"]
+    assert pauses == [100, 100, 150, 150, 100, 150]
+
+
+def test_pauses_are_exact_milliseconds(monkeypatch):
+    # Gaps whose seconds Selenium would truncate (int(1.001 * 1000) == 1000); times
+    # round to whole ms first, so a sub-millisecond gap adds no pause at all
+    plan = [(0.5, EventKind.TYPED, "a"), (1.501, EventKind.TYPED, "b"), (3.504, EventKind.TYPED, "c"),
+            (4.509, EventKind.TYPED, "d"), (4.5093, EventKind.TYPED, "e"), (6.5183, EventKind.TYPED, "f")]
+    typer = HumanTyper(seed=SEED)
+    monkeypatch.setattr(typer, "_events", lambda text: iter(plan))
+    driver = FakeDriver(record=True)
+
+    typer.type_appium(driver, "unused", batch=True)
+
+    (payload,) = driver.payloads
+    pauses = [action["duration"] for action in key_actions(payload) if action["type"] == "pause"]
+    assert pauses == [1001, 2003, 1005, 2009]
+
+
+def test_type_sync_batch_focuses_element_and_replays_text():
+    text = "She said \"it's fine\" and left."
+    driver = FakeDriver(record=True)
+    element = FakeWebElement(driver)
+
+    HumanTyper(seed=SEED).type_sync(element, text, batch=True)
+
+    assert driver.scripts == [("arguments[0].focus();", (element,))]
+    typed = []
+    for payload in driver.payloads:
+        for key in key_downs(payload):
+            if key == BACK_SPACE:
+                typed.pop()
+            else:
+                typed.append(key)
+    assert "".join(typed) == text